@@ -1,5 +1,9 @@
+import bisect
+import heapq
 import random
-from typing import List, Tuple
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple
 import os
 os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = "hide"
 import pygame
@@ -88,12 +92,12 @@ def does_line_segment_intersect_component(p1: Point, p2: Point, component: Compo
     
     return False
 
-def generate_random_component(min_width: int, max_width: int, min_height: int, max_height: int, min_pins: int, max_pins: int, existing_components: List[Component]) -> Component:
+def generate_random_component(min_width: int, max_width: int, min_height: int, max_height: int, min_pins: int, max_pins: int, existing_components: List[Component], max_attempts: int = 1000) -> Optional[Component]:
     width = random.randint(min_width, max_width)
     height = random.randint(min_height, max_height)
     
-    # keep trying new locations until a valid one is found
-    while True:
+    # try new locations until a valid one is found; a full board returns None
+    for _ in range(max_attempts):
         x = random.randint(10, 900 - width - 10)
         y = random.randint(10, 900 - height - 10)
         
@@ -107,6 +111,8 @@ def generate_random_component(min_width: int, max_width: int, min_height: int, m
         
         if valid:
             break
+    else:
+        return None
 
     # Generate pins
     num_pins = random.randint(min_pins, max_pins)
@@ -148,52 +154,257 @@ def is_component_too_close(component1: Component, component2: Component) -> bool
 def distance(point1: Point, point2: Point) -> float:
     return ((point2.x - point1.x)**2 + (point2.y - point1.y)**2)**0.5
 
-def find_path(components: List[Component], pin1: Pin, pin2: Pin) -> List[Point]:
+DIRECTIONS = [(1, 0), (0, 1), (-1, 0), (0, -1)]
+BOARD_MIN = 0
+BOARD_MAX = 1000
+
+def get_pin_exit_direction(pin: Pin, component: Component) -> Tuple[int, int]:
+    # Outward normal of the side the pin is on; pins are never on corners
+    if pin.x == 0:
+        return (-1, 0)
+    if pin.x == component.width:
+        return (1, 0)
+    if pin.y == 0:
+        return (0, -1)
+    return (0, 1)
+
+class RayIndex:
+    """Per-row and per-column sorted component intervals, built with a sweep.
+
+    rows[y] holds the (starts, ends) x-intervals of the components crossing row y,
+    and columns[x] the y-intervals crossing column x, so the first obstacle along
+    any horizontal or vertical ray is found with one binary search.
+    """
+
+    def __init__(self, components: List[Component], board_min: int = BOARD_MIN,
+                 board_max: int = BOARD_MAX):
+        # Rays stop at the board edges; pass wider bounds for boards beyond the default area
+        self.board_min = board_min
+        self.board_max = board_max
+        self.rows = self._sweep(components, lambda c: (c.y, c.y + c.height, c.x, c.x + c.width))
+        self.columns = self._sweep(components, lambda c: (c.x, c.x + c.width, c.y, c.y + c.height))
+        # The lines one unit outside component edges, where find_path's rays stop;
+        # each query only adds its two exit lines
+        xs, ys = set(), set()
+        for c in components:
+            xs.update((c.x - 1, c.x + c.width + 1))
+            ys.update((c.y - 1, c.y + c.height + 1))
+        self.xs = sorted(xs)
+        self.ys = sorted(ys)
+
+    def _sweep(self, components: List[Component], extent) -> List[Tuple[List[int], List[int]]]:
+        # Sweep the lines from board_min to board_max keeping the active intervals
+        # sorted; lines between events share the same snapshot
+        enter = {}
+        leave = {}
+        for c in components:
+            lo, hi, start, end = extent(c)
+            if hi < self.board_min or lo > self.board_max:
+                continue  # Crosses no line of the board; it would never leave the sweep
+            enter.setdefault(max(lo, self.board_min), []).append((start, end))
+            leave.setdefault(hi + 1, []).append((start, end))
+        active = []
+        snapshot = ([], [])
+        lines = []
+        for line in range(self.board_min, self.board_max + 1):
+            if line in enter or line in leave:
+                for interval in leave.get(line, ()):
+                    active.remove(interval)
+                for interval in enter.get(line, ()):
+                    bisect.insort(active, interval)
+                snapshot = ([start for start, _ in active], [end for _, end in active])
+            lines.append(snapshot)
+        return lines
+
+    def free_distance(self, x: int, y: int, dx: int, dy: int) -> int:
+        # How far a ray from (x, y) can travel in direction (dx, dy) before it would
+        # touch a component or leave the board; 0 when (x, y) is off the board
+        if not (self.board_min <= x <= self.board_max and self.board_min <= y <= self.board_max):
+            return 0
+        if dx:
+            starts, ends = self.rows[y - self.board_min]
+            position, forward = x, dx > 0
+        else:
+            starts, ends = self.columns[x - self.board_min]
+            position, forward = y, dy > 0
+        if forward:
+            i = bisect.bisect_right(starts, position)
+            return starts[i] - position - 1 if i < len(starts) else self.board_max - position
+        i = bisect.bisect_left(ends, position) - 1
+        return position - ends[i] - 1 if i >= 0 else position - self.board_min
+
+def with_line(lines: List[int], value: int) -> List[int]:
+    # lines with value inserted in order, copying only when it is new
+    i = bisect.bisect_left(lines, value)
+    if i < len(lines) and lines[i] == value:
+        return lines
+    return lines[:i] + [value] + lines[i:]
+
+class RouteStats:
+    # Search counters for one find_path call (same fields as pcb-path-finder's
+    # stats.RouteStats); timer, if given, is called as timer(phase, seconds)
+    def __init__(self, timer: Optional[Callable[[str, float], None]] = None):
+        self.nodes_expanded = 0
+        self.nodes_generated = 0
+        self.heap_pushes = 0
+        self.heap_pops = 0
+        self.peak_open = 0
+        self.obstacle_checks = 0
+        self.cache_hits = 0
+        self.phase_times: Dict[str, float] = {}
+        self.timer = timer
+
+    @contextmanager
+    def phase(self, name: str):
+        began = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - began
+            self.phase_times[name] = self.phase_times.get(name, 0.0) + elapsed
+            if self.timer is not None:
+                self.timer(name, elapsed)
+
+    def __repr__(self):
+        return (f"RouteStats(expanded={self.nodes_expanded}, generated={self.nodes_generated}, "
+                f"pushes={self.heap_pushes}, pops={self.heap_pops}, peak_open={self.peak_open}, "
+                f"ray_queries={self.obstacle_checks}, phases={self.phase_times})")
+
+def find_path(components: List[Component], pin1: Pin, pin2: Pin, bend_penalty: float = 10,
+              ray_index: RayIndex = None, return_stats: bool = False,
+              timer: Optional[Callable[[str, float], None]] = None):
+    # Returns the path, or (path, RouteStats) when return_stats is set
+    stats = RouteStats(timer)
     start_point = get_absolute_pin_location(pin1, pin1.component)
     end_point = get_absolute_pin_location(pin2, pin2.component)
 
-    queue = [([start_point], 0)]  # (path, cost)
-
-    while queue:
-        path, cost = queue.pop(0)
-        current_point = path[-1]
-
-        if current_point == end_point:
-            return path
-
-        # check for possible valid moves in the four directions
-        for dx, dy in [(1,0), (-1,0), (0,1), (0,-1)]:
-            # generate new points in the applicable direction until reaching the edge of the screen
-            for step in range(1,1000):
-                next_point = Point(current_point.x + step*dx, current_point.y + step*dy)
-                
-                # only consider moves if they stay within the screen
-                if next_point.x < 0 or next_point.x > 1000 or next_point.y < 0 or next_point.y > 1000:
-                    break
-
-                valid = True
-                for component in components:
-                    if does_line_segment_intersect_component(current_point, next_point, component):
-                      valid = False
-                      break
-
-                if valid:
-                    new_path = list(path)
-                    new_path.append(next_point)
-                    new_cost = cost + distance(current_point, next_point)
-                    queue.append((new_path, new_cost))
+    # The first segment leaves pin1 along its outward normal and the last one
+    # enters pin2 against its outward normal, so search between the two exit points
+    sdx, sdy = get_pin_exit_direction(pin1, pin1.component)
+    edx, edy = get_pin_exit_direction(pin2, pin2.component)
+    start_exit = (start_point.x + sdx, start_point.y + sdy)
+    end_exit = (end_point.x + edx, end_point.y + edy)
+    final_dir = DIRECTIONS.index((-edx, -edy))
+
+    with stats.phase('setup'):
+        # Build the ray index once per board and pass it in to share it between queries
+        if ray_index is None:
+            ray_index = RayIndex(components)
+
+        # Rays only need to stop on lines one unit outside component edges and on
+        # the exit lines; every other stop is equivalent to one of these
+        xs, ys = ray_index.xs, ray_index.ys
+        for x, y in (start_exit, end_exit):
+            xs = with_line(xs, x)
+            ys = with_line(ys, y)
+
+    def heuristic(x: int, y: int) -> float:
+        return abs(x - end_exit[0]) + abs(y - end_exit[1])
+
+    # Dijkstra/A* over (point, incoming direction) states, cost = length + bends
+    start_state = (start_exit[0], start_exit[1], DIRECTIONS.index((sdx, sdy)))
+    best_cost = {start_state: 1}
+    best_at_point = {start_exit: 1}
+    came_from = {}
+    queue = [(1 + heuristic(*start_exit), 1, start_state)]
+    goal_state = None
+    goal_cost = None
+
+    pops = expanded = rays = generated = pushes = 0
+    peak_open = 1
+
+    with stats.phase('search'):
+        while queue:
+            estimate, cost, state = heapq.heappop(queue)
+            pops += 1
+            if cost > best_cost.get(state, cost):
+                continue
+            if goal_cost is not None and estimate >= goal_cost:
+                break
+            expanded += 1
+            x, y, d = state
+            if (x, y) == end_exit:
+                total = cost + 1 + (bend_penalty if d != final_dir else 0)
+                if goal_cost is None or total < goal_cost:
+                    goal_cost = total
+                    goal_state = state
+                continue
+
+            for nd, (dx, dy) in enumerate(DIRECTIONS):
+                if nd == (d + 2) % 4:
+                    continue
+                rays += 1
+                reach = ray_index.free_distance(x, y, dx, dy)
+                if reach <= 0:
+                    continue
+                turn = bend_penalty if nd != d else 0
+                if dx:
+                    lo, hi = (x + 1, x + reach) if dx > 0 else (x - reach, x - 1)
+                    stops = xs[bisect.bisect_left(xs, lo):bisect.bisect_right(xs, hi)]
+                    position, forward = x, dx > 0
                 else:
+                    lo, hi = (y + 1, y + reach) if dy > 0 else (y - reach, y - 1)
+                    stops = ys[bisect.bisect_left(ys, lo):bisect.bisect_right(ys, hi)]
+                    position, forward = y, dy > 0
+                # Walk the stops outward from (x, y)
+                for stop in (stops if forward else reversed(stops)):
+                    nx, ny = (stop, y) if dx else (x, stop)
+                    generated += 1
+                    new_cost = cost + abs(stop - position) + turn
+                    # Prune states dominated by a cheaper arrival at the same point
+                    # (any direction can be turned into this one for bend_penalty).
+                    # That arrival reaches every later stop on this ray at least as
+                    # cheaply, so the rest of the ray is dominated too.
+                    point_cost = best_at_point.get((nx, ny))
+                    if point_cost is not None and new_cost >= point_cost + bend_penalty:
+                        break
+                    next_state = (nx, ny, nd)
+                    if new_cost < best_cost.get(next_state, new_cost + 1):
+                        best_cost[next_state] = new_cost
+                        if point_cost is None or new_cost < point_cost:
+                            best_at_point[(nx, ny)] = new_cost
+                        came_from[next_state] = state
+                        pushes += 1
+                        heapq.heappush(queue, (new_cost + heuristic(nx, ny), new_cost, next_state))
+            if len(queue) > peak_open:
+                peak_open = len(queue)
+
+    stats.nodes_expanded = expanded
+    stats.nodes_generated = generated
+    stats.heap_pushes = pushes + 1
+    stats.heap_pops = pops
+    stats.peak_open = peak_open
+    stats.obstacle_checks = rays
+
+    path = []  # No path found
+    with stats.phase('reconstruction'):
+        if goal_state is not None:
+            corners = [end_point]
+            state = goal_state
+            while True:
+                corners.append(Point(state[0], state[1]))
+                if state not in came_from:
                     break
-        
-        queue.sort(key=lambda item: item[1])  # Sort by cost
-
-    return []  # No path found
+                state = came_from[state]
+            corners.append(start_point)
+            corners.reverse()
+
+            # Drop the points in the middle of straight runs
+            path = [corners[0]]
+            for point in corners[1:]:
+                if len(path) >= 2 and (path[-2].x == path[-1].x == point.x or path[-2].y == path[-1].y == point.y):
+                    path[-1] = point
+                else:
+                    path.append(point)
+    return (path, stats) if return_stats else path
 
 def generate_test_data() -> Tuple[List[Component], Pin, Pin]:
     num_components = random.randint(20, 100)
     components = []
     for _ in range(num_components):
        component = generate_random_component(50, 150, 50, 150, 8, 30, components)
+       if component is None:
+         break  # No room left on the board
        components.append(component)
        
     # Select random pins
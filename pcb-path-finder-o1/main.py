@@ -1,10 +1,14 @@
 import random
 import matplotlib.pyplot as plt
 from collections import deque
-from dataclasses import dataclass
-from typing import List, Tuple, Optional, Set
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Tuple, Optional, Set
 import mplcursors
 import heapq
+import numpy as np
+import time
+from array import array
 
 @dataclass
 class Point:
@@ -37,64 +41,324 @@ class Component:
             points.add((self.x + self.width, j))
         return points
 
+@dataclass
+class RouteStats:
+    """
+    Search counters for one find_path_a_star / find_path_jps / find_path_lee call, returned with
+    return_stats=True. Mirrors pcb-path-finder's stats.RouteStats. The optional timer
+    is called as timer(phase, seconds) after each of 'setup', 'search' and 'reconstruction'.
+    """
+    nodes_expanded: int = 0
+    nodes_generated: int = 0
+    heap_pushes: int = 0
+    heap_pops: int = 0
+    peak_open: int = 0
+    obstacle_checks: int = 0
+    cache_hits: int = 0
+    phase_times: Dict[str, float] = field(default_factory=dict)
+    timer: Optional[Callable[[str, float], None]] = field(default=None, repr=False, compare=False)
+
+    @contextmanager
+    def phase(self, name: str):
+        began = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - began
+            self.phase_times[name] = self.phase_times.get(name, 0.0) + elapsed
+            if self.timer is not None:
+                self.timer(name, elapsed)
+
+class Occupancy:
+    """
+    Bitmap of the board cells covered by components (perimeters, corners and interiors).
+    Built once per board with NumPy slice assignment and reused across queries.
+    """
+
+    def __init__(self, components: List[Component], board_size: int = 100):
+        self.board_size = board_size
+        self.stride = board_size + 1
+        grid = np.zeros((self.stride, self.stride), dtype=np.uint8)
+        for comp in components:
+            x0, x1 = max(comp.x, 0), min(comp.x + comp.width, board_size)
+            y0, y1 = max(comp.y, 0), min(comp.y + comp.height, board_size)
+            if x0 <= x1 and y0 <= y1:
+                grid[x0:x1 + 1, y0:y1 + 1] = 1
+        self.grid = grid
+        # Flat bytes give much cheaper per-cell lookups than NumPy scalar indexing
+        self.cells = grid.tobytes()
+
+        self._jump_tables = None
+        self._padded_free = None
+        self._regions = None
+
+    def is_free(self, x: int, y: int) -> bool:
+        """True if (x, y) is on the board and not covered by a component."""
+        return 0 <= x <= self.board_size and 0 <= y <= self.board_size and \
+            not self.cells[x * self.stride + y]
+
+    def jump_tables(self) -> 'JumpTables':
+        """Goal-independent jump tables for find_path_jps, built on first use and cached."""
+        if self._jump_tables is None:
+            self._jump_tables = JumpTables(self)
+        return self._jump_tables
+
+    def padded_free(self) -> np.ndarray:
+        """
+        Flat bool array of free cells with a blocked one-cell border, for find_path_lee.
+        Cell (x, y) is at (x + 1) * (stride + 2) + y + 1. Built on first use and cached.
+        """
+        if self._padded_free is None:
+            padded = np.zeros((self.stride + 2, self.stride + 2), dtype=bool)
+            padded[1:-1, 1:-1] = self.grid == 0
+            self._padded_free = padded.ravel()
+        return self._padded_free
+
+    def regions(self) -> 'Regions':
+        """Connected regions of the free cells, built on first use and cached."""
+        if self._regions is None:
+            self._regions = Regions(self)
+        return self._regions
+
+    def may_connect(self, a: Tuple[int, int], b: Tuple[int, int],
+                    connectivity: Optional[bool] = None) -> bool:
+        """
+        False when free cells a and b are known not to be joined, so a search can be skipped.
+        connectivity=None checks only if regions() has already been built for this board,
+        True builds it if needed (worth it when many queries share the occupancy), False never checks.
+        """
+        if connectivity is None:
+            regions = self._regions
+        else:
+            regions = self.regions() if connectivity else None
+        return regions is None or regions.connected(a, b)
+
+def _next_index(mask: np.ndarray, axis: int, limit: int) -> np.ndarray:
+    """For every cell, the smallest index strictly after it along axis where mask is set (else limit)."""
+    index = np.arange(mask.shape[axis]).reshape((-1, 1) if axis == 0 else (1, -1))
+    marked = np.where(mask, index, limit)
+    nearest = np.flip(np.minimum.accumulate(np.flip(marked, axis), axis=axis), axis)
+    result = np.full_like(nearest, limit)
+    if axis == 0:
+        result[:-1] = nearest[1:]
+    else:
+        result[:, :-1] = nearest[:, 1:]
+    return result
+
+def _prev_index(mask: np.ndarray, axis: int) -> np.ndarray:
+    """For every cell, the largest index strictly before it along axis where mask is set (else -1)."""
+    index = np.arange(mask.shape[axis]).reshape((-1, 1) if axis == 0 else (1, -1))
+    nearest = np.maximum.accumulate(np.where(mask, index, -1), axis=axis)
+    result = np.full_like(nearest, -1)
+    if axis == 0:
+        result[1:] = nearest[:-1]
+    else:
+        result[:, 1:] = nearest[:, :-1]
+    return result
+
+class JumpTables:
+    """
+    Per-cell distances to the next blocked cell, forced neighbor and horizontal jump point
+    in each direction, so find_path_jps can make every jump in O(1).
+    Arrays are indexed [x, y] like the occupancy grid and flattened into array('i').
+    """
+
+    def __init__(self, occupancy: Occupancy):
+        size = occupancy.stride
+        free = np.zeros((size + 2, size + 2), dtype=bool)
+        free[1:-1, 1:-1] = occupancy.grid == 0
+        # Shifted views of the padded grid: off-board cells count as blocked
+        here = free[1:-1, 1:-1]
+        up, down = free[1:-1, 2:], free[1:-1, :-2]
+        up_left, down_left = free[:-2, 2:], free[:-2, :-2]
+        up_right, down_right = free[2:, 2:], free[2:, :-2]
+        # A horizontal run stops where a vertical move opens up beside a corner
+        forced_right = here & ((up & ~up_left) | (down & ~down_left))
+        forced_left = here & ((up & ~up_right) | (down & ~down_right))
+        blocked = ~here
+
+        next_blocked_right = _next_index(blocked, 0, size)
+        next_forced_right = _next_index(forced_right, 0, size)
+        prev_blocked_left = _prev_index(blocked, 0)
+        prev_forced_left = _prev_index(forced_left, 0)
+        # A vertical run stops wherever a horizontal run from it finds a jump point
+        horizontal = (next_forced_right < next_blocked_right) | (prev_forced_left > prev_blocked_left)
+
+        def flat(table: np.ndarray) -> array:
+            return array('i', table.astype(np.int32).tobytes())
+
+        self.stride = size
+        self.next_blocked_right = flat(next_blocked_right)
+        self.next_forced_right = flat(next_forced_right)
+        self.prev_blocked_left = flat(prev_blocked_left)
+        self.prev_forced_left = flat(prev_forced_left)
+        self.next_blocked_up = flat(_next_index(blocked, 1, size))
+        self.next_horizontal_up = flat(_next_index(horizontal, 1, size))
+        self.prev_blocked_down = flat(_prev_index(blocked, 1))
+        self.prev_horizontal_down = flat(_prev_index(horizontal, 1))
+
+class Regions:
+    """
+    Labels the 4-connected regions of free cells once per board, so the finders can reject
+    a query whose pin exits lie in different regions without searching.
+    Each column's free cells form vertical runs; union-find joins every run to the runs it
+    overlaps in the next column, so the union work is proportional to the runs, not the cells.
+    """
+
+    def __init__(self, occupancy: Occupancy):
+        size = occupancy.stride
+        free = occupancy.grid == 0
+        # A run starts at every free cell whose lower neighbour is blocked or off the board
+        run_start = free.copy()
+        run_start[:, 1:] &= ~free[:, :-1]
+        # Cells are numbered column by column, so a running count of run starts gives
+        # every free cell the id of its run
+        run_of_cell = np.cumsum(run_start.ravel()).reshape(free.shape) - 1
+        run_end = free.copy()
+        run_end[:, :-1] &= ~free[:, 1:]
+        start_x, start_y = np.nonzero(run_start)
+        end_y = np.nonzero(run_end)[1]
+        column_first = np.searchsorted(start_x, np.arange(size + 1)).tolist()
+        start_y, end_y = start_y.tolist(), end_y.tolist()
+
+        parent = list(range(len(start_y)))
+
+        def find(i: int) -> int:
+            root = i
+            while parent[root] != root:
+                root = parent[root]
+            while parent[i] != root:
+                parent[i], i = root, parent[i]
+            return root
+
+        for x in range(size - 1):
+            # Walk the runs of columns x and x + 1 in step, joining those that overlap
+            i, i_end = column_first[x], column_first[x + 1]
+            j, j_end = column_first[x + 1], column_first[x + 2]
+            while i < i_end and j < j_end:
+                if start_y[i] <= end_y[j] and start_y[j] <= end_y[i]:
+                    a, b = find(i), find(j)
+                    if a != b:
+                        parent[b] = a
+                if end_y[i] < end_y[j]:
+                    i += 1
+                else:
+                    j += 1
+
+        roots = np.array([find(i) for i in range(len(parent))], dtype=np.int64)
+        region_of_run = np.unique(roots, return_inverse=True)[1] if len(roots) else roots
+        labels = np.full(free.shape, -1, dtype=np.int32)
+        labels[free] = region_of_run[run_of_cell[free]]
+        self.board_size = occupancy.board_size
+        self.stride = size
+        self.count = int(labels.max()) + 1
+        self.labels = array('i', labels.tobytes())
+
+    def region(self, x: int, y: int) -> int:
+        """Region number of (x, y), or -1 if it is off the board or covered."""
+        if 0 <= x <= self.board_size and 0 <= y <= self.board_size:
+            return self.labels[x * self.stride + y]
+        return -1
+
+    def connected(self, a: Tuple[int, int], b: Tuple[int, int]) -> bool:
+        """True if free cells a and b can be joined by a path of free cells."""
+        region = self.region(*a)
+        return region >= 0 and region == self.region(*b)
+
 def generate_random_components(num_components: int, min_size: int = 5, max_size: int = 20,
-                              board_size: int = 100, min_spacing: int = 2) -> List[Component]:
+                              board_size: int = 100, min_spacing: int = 2,
+                              seed: Optional[int] = None) -> List[Component]:
+    """Place up to num_components spaced components by bounded random retry.
+
+    Placed rectangles are bucketed in a spatial hash with cells of
+    max_size + min_spacing, so each try checks at most four buckets instead
+    of every component.
+    """
+    rng = random.Random(seed)
+    cell = max_size + min_spacing
+    buckets = {}
     components = []
     attempts = 0
     while len(components) < num_components and attempts < num_components * 10:
-        width = random.randint(min_size, max_size)
-        height = random.randint(min_size, max_size)
-        x = random.randint(0, board_size - width)
-        y = random.randint(0, board_size - height)
-        new_component = Component(x, y, width, height, [])
-        # Check spacing
-        collision = False
-        for comp in components:
-            if not (new_component.x + new_component.width + min_spacing <= comp.x or
-                    new_component.x >= comp.x + comp.width + min_spacing or
-                    new_component.y + new_component.height + min_spacing <= comp.y or
-                    new_component.y >= comp.y + comp.height + min_spacing):
-                collision = True
-                break
-        if not collision:
-            # Generate random pins on the perimeter, not on corners
-            num_pins = random.randint(8, 30)
-            perimeter = []
-            for i in range(new_component.x + 1, new_component.x + new_component.width):
-                perimeter.append((i, new_component.y))
-                perimeter.append((i, new_component.y + new_component.height))
-            for j in range(new_component.y + 1, new_component.y + new_component.height):
-                perimeter.append((new_component.x, j))
-                perimeter.append((new_component.x + new_component.width, j))
-            # Ensure unique pin positions
-            if len(perimeter) < num_pins:
-                pins_positions = perimeter  # All available positions
-            else:
-                pins_positions = random.sample(perimeter, num_pins)
-            for pos in pins_positions:
-                pin = Pin(pos[0], pos[1], new_component)
-                new_component.pins.append(pin)
-            components.append(new_component)
         attempts += 1
+        width = rng.randint(min_size, max_size)
+        height = rng.randint(min_size, max_size)
+        x = rng.randint(0, board_size - width)
+        y = rng.randint(0, board_size - height)
+        # Check spacing against the components in nearby buckets
+        collision = False
+        for cx in range((x - min_spacing) // cell, (x + width + min_spacing) // cell + 1):
+            for cy in range((y - min_spacing) // cell, (y + height + min_spacing) // cell + 1):
+                for comp in buckets.get((cx, cy), ()):
+                    if not (x + width + min_spacing <= comp.x or
+                            x >= comp.x + comp.width + min_spacing or
+                            y + height + min_spacing <= comp.y or
+                            y >= comp.y + comp.height + min_spacing):
+                        collision = True
+                        break
+        if collision:
+            continue
+        new_component = Component(x, y, width, height, [])
+        for cx in range(x // cell, (x + width) // cell + 1):
+            for cy in range(y // cell, (y + height) // cell + 1):
+                buckets.setdefault((cx, cy), []).append(new_component)
+        # Generate random pins on the perimeter, not on corners
+        num_pins = rng.randint(8, 30)
+        perimeter = []
+        for i in range(x + 1, x + width):
+            perimeter.append((i, y))
+            perimeter.append((i, y + height))
+        for j in range(y + 1, y + height):
+            perimeter.append((x, j))
+            perimeter.append((x + width, j))
+        # Ensure unique pin positions
+        if len(perimeter) < num_pins:
+            pins_positions = perimeter  # All available positions
+        else:
+            pins_positions = rng.sample(perimeter, num_pins)
+        for pos in pins_positions:
+            new_component.pins.append(Pin(pos[0], pos[1], new_component))
+        components.append(new_component)
     return components
 
-def find_path_a_star(start_pin: Pin, end_pin: Pin, components: List[Component]) -> Optional[List[Point]]:
+def exit_direction(pin: Pin) -> Tuple[int, int]:
+    """Outward normal of the component side the pin sits on (pins are never on corners)."""
+    comp = pin.component
+    if pin.x == comp.x:
+        return (-1, 0)
+    if pin.x == comp.x + comp.width:
+        return (1, 0)
+    if pin.y == comp.y:
+        return (0, -1)
+    return (0, 1)
+
+def reconstruct_path(came_from: dict, current: Tuple[int, int]) -> List[Point]:
+    """Walks the parent pointers back from the goal and returns the path start-first."""
+    path = [Point(*current)]
+    while current in came_from:
+        current = came_from[current]
+        path.append(Point(*current))
+    path.reverse()
+    return path
+
+def find_path_a_star(start_pin: Pin, end_pin: Pin, components: List[Component],
+                     occupancy: Optional[Occupancy] = None, return_stats: bool = False,
+                     timer: Optional[Callable[[str, float], None]] = None,
+                     connectivity: Optional[bool] = None):
     """
     Implements the A* algorithm to find a path from start_pin to end_pin using horizontal and vertical segments.
+    Pass an Occupancy built once for the board to skip rebuilding it on every query.
+    connectivity is passed to Occupancy.may_connect: by default pins in different regions
+    fail without a search only when the occupancy's regions are already built.
+    Returns the path (None if there is none), or (path, RouteStats) when return_stats is set.
     """
+    stats = RouteStats(timer=timer)
     start = (start_pin.x, start_pin.y)
     end = (end_pin.x, end_pin.y)
 
-    # Create a set of blocked points (component interiors and perimeters)
-    blocked = set()
-    for comp in components:
-        blocked.update(comp.get_perimeter_points())
-        for i in range(comp.x + 1, comp.x + comp.width):
-            for j in range(comp.y + 1, comp.y + comp.height):
-                blocked.add((i, j))
-    # Remove start and end points from blocked if they are on perimeters
-    blocked.discard(start)
-    blocked.discard(end)
+    with stats.phase('setup'):
+        if occupancy is None:
+            occupancy = Occupancy(components)
 
     def heuristic(a: Tuple[int, int], b: Tuple[int, int]) -> int:
         """Manhattan distance heuristic."""
@@ -107,54 +371,315 @@ def find_path_a_star(start_pin: Pin, end_pin: Pin, components: List[Component])
         # Implemented within move logic below
         return True  # Placeholder for additional constraints
 
-    open_set = []
-    heapq.heappush(open_set, (heuristic(start, end), 0, start, [Point(*start)]))
-    visited = set()
-    visited.add(start)
-
-    while open_set:
-        estimated_total, cost, current, path = heapq.heappop(open_set)
-        if current == end:
-            return path
-        x, y = current
-        # Explore neighbors: up, down, left, right
-        neighbors = [(x, y + 1), (x, y - 1), (x + 1, y), (x - 1, y)]
-        for nx, ny in neighbors:
-            if 0 <= nx <= 100 and 0 <= ny <= 100 and (nx, ny) not in blocked and (nx, ny) not in visited:
+    # Outward normals of the pin sides: the first move must leave along the start
+    # normal and the last move must arrive against the end normal
+    sdx, sdy = exit_direction(start_pin)
+    edx, edy = exit_direction(end_pin)
+    first_step = (start[0] + sdx, start[1] + sdy)
+    last_step = (end[0] + edx, end[1] + edy)
+    # Pins walled off from each other fail here instead of after a search of their region
+    if not occupancy.may_connect(first_step, last_step, connectivity):
+        return (None, stats) if return_stats else None
+
+    open_set = [(heuristic(start, end), 0, start)]
+    g_score = {start: 0}
+    came_from = {}
+    closed = set()
+    found = False
+    pops = checks = generated = pushes = 0
+    peak_open = 1
+
+    with stats.phase('search'):
+        while open_set:
+            estimated_total, cost, current = heapq.heappop(open_set)
+            pops += 1
+            if current in closed:
+                continue
+            if current == end:
+                found = True
+                break
+            closed.add(current)
+            x, y = current
+            # Explore neighbors: up, down, left, right
+            neighbors = [(x, y + 1), (x, y - 1), (x + 1, y), (x - 1, y)]
+            for nx, ny in neighbors:
+                neighbor = (nx, ny)
+                if neighbor in closed:
+                    continue
                 # Perpendicular constraint for the first and last move
-                if len(path) == 1:
-                    # First move should be perpendicular to the start component perimeter
-                    if start_pin.x == nx:
-                        # Vertical move
-                        if start_pin.component.y + start_pin.component.height == y:
-                            pass
-                        else:
-                            continue
-                    elif start_pin.y == ny:
-                        # Horizontal move
-                        if start_pin.component.x + start_pin.component.width == x:
-                            pass
-                        else:
-                            continue
-                if (nx, ny) == end:
-                    # Last move should be perpendicular to the end component perimeter
-                    if end_pin.x == nx:
-                        # Vertical move
-                        if end_pin.component.y + end_pin.component.height == ny:
-                            pass
-                        else:
-                            continue
-                    elif end_pin.y == ny:
-                        # Horizontal move
-                        if end_pin.component.x + end_pin.component.width == x:
-                            pass
-                        else:
-                            continue
-                visited.add((nx, ny))
+                if current == start and neighbor != first_step:
+                    continue
+                if neighbor == end:
+                    if current != last_step:
+                        continue
+                # The end pin sits on a component perimeter, so it is the one covered cell we may enter
+                else:
+                    checks += 1
+                    if not occupancy.is_free(nx, ny):
+                        continue
+                generated += 1
                 new_cost = cost + 1
-                estimated = new_cost + heuristic((nx, ny), end)
-                heapq.heappush(open_set, (estimated, new_cost, (nx, ny), path + [Point(nx, ny)]))
-    return None
+                if new_cost < g_score.get(neighbor, new_cost + 1):
+                    g_score[neighbor] = new_cost
+                    came_from[neighbor] = current
+                    pushes += 1
+                    heapq.heappush(open_set, (new_cost + heuristic(neighbor, end), new_cost, neighbor))
+            if len(open_set) > peak_open:
+                peak_open = len(open_set)
+
+    stats.nodes_expanded = len(closed)
+    stats.nodes_generated = generated
+    stats.heap_pushes = pushes + 1
+    stats.heap_pops = pops
+    stats.peak_open = peak_open
+    stats.obstacle_checks = checks
+    path = None
+    with stats.phase('reconstruction'):
+        if found:
+            path = reconstruct_path(came_from, end)
+    return (path, stats) if return_stats else path
+
+def find_path_jps(start_pin: Pin, end_pin: Pin, components: List[Component],
+                  occupancy: Optional[Occupancy] = None, return_stats: bool = False,
+                  timer: Optional[Callable[[str, float], None]] = None,
+                  connectivity: Optional[bool] = None):
+    """
+    4-connected Jump Point Search over the same occupancy grid as find_path_a_star.
+    Straight runs are skipped in one jump; only jump points next to component corners
+    (and the cells lining up with the goal) go on the heap. Paths are as short as A*'s.
+    Returns the path (None if there is none), or (path, RouteStats) when return_stats is set;
+    each jump counts as one obstacle check, since it is answered by a table lookup.
+    connectivity works as in find_path_a_star.
+    """
+    stats = RouteStats(timer=timer)
+    with stats.phase('setup'):
+        if occupancy is None:
+            occupancy = Occupancy(components)
+        tables = occupancy.jump_tables()
+    is_free = occupancy.is_free
+
+    start = (start_pin.x, start_pin.y)
+    end = (end_pin.x, end_pin.y)
+    sdx, sdy = exit_direction(start_pin)
+    edx, edy = exit_direction(end_pin)
+    # Search between the cells just outside the pins so the first and last moves
+    # are perpendicular to the component perimeters
+    source = (start[0] + sdx, start[1] + sdy)
+    goal = (end[0] + edx, end[1] + edy)
+    if not is_free(*source) or not is_free(*goal) or \
+            not occupancy.may_connect(source, goal, connectivity):
+        return (None, stats) if return_stats else None
+
+    stride = tables.stride
+    gx, gy = goal
+
+    def goal_in_row(x: int, y: int) -> bool:
+        # The goal is reachable by a straight horizontal run from (x, y)
+        if y != gy:
+            return False
+        i = x * stride + y
+        if gx > x:
+            return gx < tables.next_blocked_right[i]
+        return gx > tables.prev_blocked_left[i]
+
+    def jump(x: int, y: int, dx: int, dy: int) -> Optional[Tuple[int, int]]:
+        """
+        Returns the first jump point from (x, y) in direction (dx, dy), if any.
+        Canonical paths move vertically before horizontally, so a horizontal run only
+        stops where a vertical move becomes newly possible, and a vertical run stops
+        wherever a horizontal run from it would find a jump point or the goal.
+        """
+        i = x * stride + y
+        if dx > 0:
+            limit = tables.next_blocked_right[i]
+            stop = tables.next_forced_right[i]
+            if y == gy and x < gx < limit:
+                stop = min(stop, gx)
+            return (stop, y) if stop < limit else None
+        if dx < 0:
+            limit = tables.prev_blocked_left[i]
+            stop = tables.prev_forced_left[i]
+            if y == gy and limit < gx < x:
+                stop = max(stop, gx)
+            return (stop, y) if stop > limit else None
+        if dy > 0:
+            limit = tables.next_blocked_up[i]
+            stop = tables.next_horizontal_up[i]
+            if y < gy < limit and (gx == x or goal_in_row(x, gy)):
+                stop = min(stop, gy)
+            return (x, stop) if stop < limit else None
+        limit = tables.prev_blocked_down[i]
+        stop = tables.prev_horizontal_down[i]
+        if limit < gy < y and (gx == x or goal_in_row(x, gy)):
+            stop = max(stop, gy)
+        return (x, stop) if stop > limit else None
+
+    def successor_directions(x: int, y: int, direction: Optional[Tuple[int, int]]):
+        if direction is None:
+            return [(0, 1), (0, -1), (1, 0), (-1, 0)]
+        dx, dy = direction
+        if dy:
+            return [direction, (1, 0), (-1, 0)]
+        directions = [direction]
+        for sy in (1, -1):
+            if is_free(x, y + sy) and not is_free(x - dx, y + sy):
+                directions.append((0, sy))
+        return directions
+
+    def heuristic(node: Tuple[int, int]) -> int:
+        return abs(node[0] - goal[0]) + abs(node[1] - goal[1])
+
+    # States are (jump point, direction it was entered with)
+    start_state = (source, None)
+    open_set = [(heuristic(source), 0, 0, start_state)]
+    g_score = {start_state: 0}
+    came_from = {}
+    closed = set()
+    counter = 0
+
+    goal_state = None
+    pops = expanded = jumps = generated = 0
+    peak_open = 1
+
+    with stats.phase('search'):
+        while open_set:
+            _, cost, _, state = heapq.heappop(open_set)
+            pops += 1
+            if state in closed:
+                continue
+            node, direction = state
+            if node == goal:
+                goal_state = state
+                break
+            closed.add(state)
+            expanded += 1
+            x, y = node
+            for dx, dy in successor_directions(x, y, direction):
+                jumps += 1
+                jump_point = jump(x, y, dx, dy)
+                if jump_point is None:
+                    continue
+                generated += 1
+                next_state = (jump_point, (dx, dy))
+                new_cost = cost + abs(jump_point[0] - x) + abs(jump_point[1] - y)
+                if new_cost < g_score.get(next_state, new_cost + 1):
+                    g_score[next_state] = new_cost
+                    came_from[next_state] = state
+                    counter += 1
+                    heapq.heappush(open_set, (new_cost + heuristic(jump_point), new_cost, counter, next_state))
+            if len(open_set) > peak_open:
+                peak_open = len(open_set)
+
+    stats.nodes_expanded = expanded
+    stats.nodes_generated = generated
+    stats.heap_pushes = counter + 1
+    stats.heap_pops = pops
+    stats.peak_open = peak_open
+    stats.obstacle_checks = jumps
+    path = None
+    with stats.phase('reconstruction'):
+        if goal_state is not None:
+            state = goal_state
+            jump_points = [state[0]]
+            while state in came_from:
+                state = came_from[state]
+                jump_points.append(state[0])
+            jump_points.reverse()
+            # Expand the jump points back into unit steps, as find_path_a_star returns
+            path = [Point(*start)]
+            for (ax, ay), (bx, by) in zip(jump_points, jump_points[1:]):
+                step_x = (bx > ax) - (bx < ax)
+                step_y = (by > ay) - (by < ay)
+                while (ax, ay) != (bx, by):
+                    path.append(Point(ax, ay))
+                    ax += step_x
+                    ay += step_y
+            path.append(Point(*goal))
+            path.append(Point(*end))
+    return (path, stats) if return_stats else path
+
+def find_path_lee(start_pin: Pin, end_pin: Pin, components: List[Component],
+                  occupancy: Optional[Occupancy] = None, return_stats: bool = False,
+                  timer: Optional[Callable[[str, float], None]] = None,
+                  connectivity: Optional[bool] = None):
+    """
+    Lee's wavefront router over the same occupancy grid, vectorized with NumPy.
+    Each distance ring is one array step: the frontier's flat indices are shifted in all
+    four directions at once and masked against the free cells and the cells already
+    reached. The path is then traced back through the distance field, preferring to keep
+    going straight. Paths are as short as A*'s; the work per ring is proportional to the
+    frontier, not the board. Returns the path (None if there is none), or (path, RouteStats)
+    when return_stats is set; every cell reached counts as expanded. connectivity works as
+    in find_path_a_star.
+    """
+    stats = RouteStats(timer=timer)
+    with stats.phase('setup'):
+        if occupancy is None:
+            occupancy = Occupancy(components)
+        free = occupancy.padded_free()
+
+    start = (start_pin.x, start_pin.y)
+    end = (end_pin.x, end_pin.y)
+    sdx, sdy = exit_direction(start_pin)
+    edx, edy = exit_direction(end_pin)
+    # As in find_path_jps, the wave runs between the cells just outside the pins, so the
+    # first and last moves are perpendicular to the component perimeters and the pins,
+    # which sit on covered cells, are never entered in between
+    source = (start[0] + sdx, start[1] + sdy)
+    goal = (end[0] + edx, end[1] + edy)
+    if not occupancy.is_free(*source) or not occupancy.is_free(*goal) or \
+            not occupancy.may_connect(source, goal, connectivity):
+        return (None, stats) if return_stats else None
+
+    width = occupancy.stride + 2
+    offsets = np.array([width, -width, 1, -1], dtype=np.int64)
+    source_index = (source[0] + 1) * width + source[1] + 1
+    goal_index = (goal[0] + 1) * width + goal[1] + 1
+
+    reached = generated = 0
+    peak_open = 1
+    with stats.phase('search'):
+        dist = np.full(free.shape, -1, dtype=np.int32)
+        dist[source_index] = 0
+        frontier = np.array([source_index], dtype=np.int64)
+        ring = 0
+        while frontier.size and dist[goal_index] < 0:
+            ring += 1
+            candidates = (frontier[:, None] + offsets).ravel()
+            generated += candidates.size
+            # The blocked border keeps every shifted index on the grid
+            candidates = candidates[free[candidates] & (dist[candidates] < 0)]
+            frontier = np.unique(candidates)
+            dist[frontier] = ring
+            reached += frontier.size
+            peak_open = max(peak_open, frontier.size)
+
+    stats.nodes_expanded = reached + 1
+    stats.nodes_generated = generated
+    stats.peak_open = peak_open
+    stats.obstacle_checks = generated
+    path = None
+    with stats.phase('reconstruction'):
+        if dist[goal_index] >= 0:
+            # Walk down the distance field from the goal, turning only when the
+            # current direction stops descending
+            steps = [(width, (1, 0)), (-width, (-1, 0)), (1, (0, 1)), (-1, (0, -1))]
+            index, (x, y) = goal_index, goal
+            path = [Point(*end), Point(x, y)]
+            previous = None
+            while index != source_index:
+                lower = dist[index] - 1
+                if previous is not None and dist[index - previous[0]] == lower:
+                    step = previous
+                else:
+                    step = next(s for s in steps if dist[index - s[0]] == lower)
+                index -= step[0]
+                x, y = x - step[1][0], y - step[1][1]
+                path.append(Point(x, y))
+                previous = step
+            path.append(Point(*start))
+            path.reverse()
+    return (path, stats) if return_stats else path
 
 def visualize(components: List[Component], path: Optional[List[Point]] = None,
               start_pin: Optional[Pin] = None, end_pin: Optional[Pin] = None):
@@ -267,7 +792,8 @@ def test_procedure():
     while end_pin.component == start_pin.component:
         end_pin = random.choice(all_pins)
     print(f"Finding path from Pin at ({start_pin.x}, {start_pin.y}) to Pin at ({end_pin.x}, {end_pin.y})")
-    path = find_path_a_star(start_pin, end_pin, components)
+    occupancy = Occupancy(components)
+    path = find_path_a_star(start_pin, end_pin, components, occupancy)
     if path:
         print("Path found:")
         for point in path:
@@ -0,0 +1,123 @@
+"""Route many pin pairs on one board across a pool of worker processes.
+
+The board is published in a module global before the pool forks, so every
+worker inherits it copy-on-write instead of receiving a pickled copy, and
+each task on the wire is just three integers. If the engine offers a
+reachability check (see engines.py), it is built at the same time, and pairs
+the engine cannot route under its own obstacle model come back as 'no_path'
+without a search. Results stream back in completion order:
+
+    for result in route_many(components, pairs, workers=8, timeout=2.0):
+        print(result.index, result.status, len(result.path))
+"""
+import multiprocessing
+import os
+import signal
+import time
+from dataclasses import dataclass, field
+from typing import Collection, Dict, Iterator, List, Optional, Sequence, Tuple
+from models import Component, Pin, Point
+from engines import get_engine, reachability
+from stats import stats_to_dict
+
+@dataclass
+class BatchResult:
+    index: int  # Position of the pair in the pairs argument
+    status: str  # 'ok', 'no_path', 'timeout' or 'error'
+    path: List[Point] = field(default_factory=list)
+    seconds: float = 0.0
+    stats: Optional[dict] = None
+    error: Optional[str] = None
+
+class _PairTimeout(Exception):
+    pass
+
+# (engine name, components, flat pin list, per-pair timeout, the engine's
+# reachability check or None), set in the parent before the pool forks and
+# inherited by every worker
+_BATCH = None
+
+def _on_timeout(signum, frame):
+    raise _PairTimeout()
+
+def _route_task(task: Tuple[int, int, int]) -> BatchResult:
+    index, start, end = task
+    engine, components, pins, timeout, can_connect = _BATCH
+    began = time.perf_counter()
+    if can_connect is not None and not can_connect(pins[start], pins[end]):
+        return BatchResult(index, 'no_path', seconds=time.perf_counter() - began)
+    # The timer counts this process's CPU time, not wall-clock time, so a pair
+    # waiting for a core while other workers run is not charged for the wait.
+    # Only the main thread can take SIGPROF; elsewhere pairs run untimed.
+    timed = timeout is not None and hasattr(signal, 'setitimer') and \
+        signal.getsignal(signal.SIGPROF) is _on_timeout
+    path, stats, status, error = [], None, 'timeout', None
+    try:
+        # The timer is disarmed before anything else happens once the route
+        # returns; if it fires first, the pair is a timeout like any other
+        try:
+            if timed:
+                signal.setitimer(signal.ITIMER_PROF, timeout)
+            path, stats = get_engine(engine).route(components, pins[start], pins[end],
+                                                   return_stats=True)
+        finally:
+            if timed:
+                signal.setitimer(signal.ITIMER_PROF, 0)
+        status = 'ok' if path else 'no_path'
+    except _PairTimeout:
+        path, stats = [], None
+    except Exception as e:
+        status, error = 'error', repr(e)
+    seconds = time.perf_counter() - began
+    return BatchResult(index, status, path, seconds,
+                       stats_to_dict(stats) if stats is not None else None, error)
+
+def _init_worker():
+    signal.signal(signal.SIGPROF, _on_timeout)
+    # Ctrl-C is handled by the parent, which tears the pool down
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+def route_many(components: Collection[Component], pairs: Sequence[Tuple[Pin, Pin]],
+               workers: Optional[int] = None, engine: str = 'router',
+               chunk_size: Optional[int] = None,
+               timeout: Optional[float] = None) -> Iterator[BatchResult]:
+    # Yields one BatchResult per pair, in completion order. workers defaults
+    # to the CPU count; workers=1 routes in this process. timeout is per pair,
+    # in seconds of CPU time spent routing it.
+    global _BATCH
+    components = list(components)
+    pins = [pin for comp in components for pin in comp.pins]
+    pin_index: Dict[int, int] = {id(pin): i for i, pin in enumerate(pins)}
+    tasks = [(i, pin_index[id(start)], pin_index[id(end)]) for i, (start, end) in enumerate(pairs)]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(tasks)))
+    if chunk_size is None:
+        # A few chunks per worker keeps everyone busy when pair costs vary
+        chunk_size = max(1, len(tasks) // (workers * 8))
+
+    # Load the engine and its reachability check before forking so workers
+    # inherit them ready to use
+    can_connect = reachability(get_engine(engine), components)
+    _BATCH = (engine, components, pins, timeout, can_connect)
+    try:
+        if workers == 1 or 'fork' not in multiprocessing.get_all_start_methods():
+            previous = None
+            if timeout is not None and hasattr(signal, 'SIGPROF'):
+                try:
+                    previous = signal.signal(signal.SIGPROF, _on_timeout)
+                except ValueError:
+                    pass  # Not the main thread: run without timeouts
+            try:
+                for task in tasks:
+                    yield _route_task(task)
+            finally:
+                if previous is not None:
+                    signal.signal(signal.SIGPROF, previous)
+            return
+
+        context = multiprocessing.get_context('fork')
+        with context.Pool(workers, initializer=_init_worker) as pool:
+            yield from pool.imap_unordered(_route_task, tasks, chunksize=chunk_size)
+    finally:
+        _BATCH = None
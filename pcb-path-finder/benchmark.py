@@ -0,0 +1,245 @@
+"""Reproducible routing benchmark across the routing engines.
+
+Generates a seeded corpus of boards, routes the same pin pairs with every
+engine registered in engines.py (router.find_route in both modes, the
+visibility router, o1's A* and JPS, gais's find_path) in forked worker
+processes with a per-query timeout, and writes a JSON report.
+
+    python benchmark.py --scales 20 100 --queries 5 --output report.json
+    python benchmark.py --baseline report.json   # exits 1 on regression
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Dict, List, Optional, Set, Tuple
+
+# Engines are run headless; o1 imports pyplot and gais imports pygame
+os.environ.setdefault('MPLBACKEND', 'Agg')
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+from models import Component, Pin, Point
+from router import simplify_path
+from generator import generate_board
+from stats import stats_to_dict
+from engines import ENGINES, get_engine
+
+DEFAULT_SCALES = [20, 100, 1000, 10000]
+
+def pick_queries(components: Set[Component], count: int, seed: int) -> List[Tuple[Pin, Pin]]:
+    rng = random.Random(seed)
+    # Sort so the choice does not depend on set iteration order
+    ordered = sorted(components, key=lambda c: (c.x, c.y))
+    queries = []
+    for _ in range(count):
+        first, second = rng.sample(ordered, 2)
+        start = rng.choice(sorted(first.pins, key=lambda p: (p.x, p.y)))
+        end = rng.choice(sorted(second.pins, key=lambda p: (p.x, p.y)))
+        queries.append((start, end))
+    return queries
+
+def run_engine(name: str, components: Set[Component], start: Pin, end: Pin):
+    # A fresh adapter per run, so board conversion is timed and traced with the search
+    path, stats = ENGINES[name]().route(components, start, end, return_stats=True)
+    return [(p.x, p.y) for p in path], stats
+
+def load_engines(names: List[str]) -> List[str]:
+    available = []
+    for name in names:
+        try:
+            get_engine(name)
+        except ImportError as e:
+            print(f"Skipping engine {name}: {e}", file=sys.stderr)
+            continue
+        available.append(name)
+    return available
+
+def path_metrics(path: List[Tuple[int, int]]) -> Tuple[int, int]:
+    corners = simplify_path([Point(x, y) for x, y in path])
+    length = sum(abs(a.x - b.x) + abs(a.y - b.y) for a, b in zip(corners, corners[1:]))
+    return length, max(0, len(corners) - 2)
+
+# The traced memory pass runs several times slower than the timed one, so it
+# gets its own budget of this many times the query timeout
+TRACE_BUDGET = 10
+
+def _run_query(conn, engine: str, components, start: Pin, end: Pin, measure_memory: bool):
+    # Runs in a forked child, so the board is inherited rather than pickled.
+    # Sends the timed result, then the traced peak memory as a second message.
+    sys.stdout = open(os.devnull, 'w')
+    try:
+        began = time.perf_counter()
+        path, stats = run_engine(engine, components, start, end)
+        wall_time = time.perf_counter() - began
+        result = {'status': 'ok' if path else 'no_path',
+                  'wall_time': wall_time,
+                  'peak_memory': None,
+                  'nodes_expanded': stats.nodes_expanded,
+                  'stats': stats_to_dict(stats),
+                  'path_length': None,
+                  'bends': None}
+        if path:
+            result['path_length'], result['bends'] = path_metrics(path)
+        conn.send(result)
+    except Exception as e:
+        conn.send({'status': 'error', 'error': repr(e)})
+        conn.close()
+        return
+    try:
+        if measure_memory:
+            # Second, traced pass: tracemalloc would distort the timing above
+            tracemalloc.start()
+            run_engine(engine, components, start, end)
+            conn.send(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+    except Exception:
+        conn.send(None)
+    finally:
+        conn.close()
+
+def run_query(engine: str, components, start: Pin, end: Pin,
+              timeout: float, measure_memory: bool = True) -> Dict:
+    # timeout bounds only the timed pass. A query whose traced pass overruns
+    # TRACE_BUDGET * timeout keeps its result with peak_memory None.
+    context = multiprocessing.get_context('fork')
+    parent, child = context.Pipe(duplex=False)
+    process = context.Process(target=_run_query,
+                              args=(child, engine, components, start, end, measure_memory))
+    process.start()
+    child.close()
+    if parent.poll(timeout):
+        try:
+            result = parent.recv()
+        except EOFError:
+            # The child died before it could send (a crash or a kill)
+            process.join(timeout)
+            result = {'status': 'error', 'error': f'worker exited with code {process.exitcode}'}
+        if measure_memory and result['status'] != 'error':
+            try:
+                if parent.poll(timeout * TRACE_BUDGET):
+                    result['peak_memory'] = parent.recv()
+            except EOFError:
+                pass  # The child died during the traced pass
+    else:
+        result = {'status': 'timeout'}
+    process.terminate()
+    process.join()
+    return result
+
+def summarize(results: List[Dict]) -> Dict:
+    summary: Dict[str, Dict[str, Dict]] = {}
+    groups: Dict[Tuple[str, int], List[Dict]] = {}
+    for result in results:
+        groups.setdefault((result['engine'], result['scale']), []).append(result)
+    for (engine, scale), group in sorted(groups.items()):
+        solved = [r for r in group if r['status'] == 'ok']
+        finished = [r for r in group if r['status'] in ('ok', 'no_path')]
+        entry = {
+            'queries': len(group),
+            'solved': len(solved),
+            'timeouts': sum(r['status'] == 'timeout' for r in group),
+            'errors': sum(r['status'] == 'error' for r in group),
+            'median_wall_time': statistics.median(r['wall_time'] for r in finished) if finished else None,
+            'max_peak_memory': max((r['peak_memory'] for r in finished if r.get('peak_memory') is not None),
+                                   default=None),
+            'mean_path_length': statistics.mean(r['path_length'] for r in solved) if solved else None,
+            'mean_bends': statistics.mean(r['bends'] for r in solved) if solved else None,
+        }
+        # Long routes: the half of the solved queries with the largest pin
+        # separation, where path-copying and memory costs show up first
+        by_distance = sorted(solved, key=lambda r: r['manhattan_distance'])
+        long_routes = by_distance[len(by_distance) // 2:]
+        entry['long_route_median_wall_time'] = \
+            statistics.median(r['wall_time'] for r in long_routes) if long_routes else None
+        entry['long_route_max_peak_memory'] = max(
+            (r['peak_memory'] for r in long_routes if r.get('peak_memory') is not None), default=None)
+        summary.setdefault(engine, {})[str(scale)] = entry
+    return summary
+
+def run_benchmark(scales: List[int], engines: List[str], queries: int,
+                  timeout: float, seed: int, measure_memory: bool = True,
+                  density: float = 0.15, strategy: str = 'dart') -> Dict:
+    engines = load_engines(engines)
+    results = []
+    for scale in scales:
+        board_seed = seed * 1000003 + scale
+        components = generate_board(scale, board_seed, density=density, strategy=strategy)
+        for index, (start, end) in enumerate(pick_queries(components, queries, board_seed)):
+            distance = abs(start.get_absolute_position().x - end.get_absolute_position().x) + \
+                abs(start.get_absolute_position().y - end.get_absolute_position().y)
+            for engine in engines:
+                result = run_query(engine, components, start, end, timeout, measure_memory)
+                result.update({'engine': engine, 'scale': scale, 'query': index,
+                               'manhattan_distance': distance})
+                results.append(result)
+                print(f"{engine:>20} n={scale:<6} q={index:<3} {result['status']:<8} "
+                      f"{result.get('wall_time') or 0:.4f}s", file=sys.stderr)
+    return {
+        'meta': {'seed': seed, 'scales': scales, 'engines': engines, 'queries': queries,
+                 'timeout': timeout, 'density': density, 'strategy': strategy,
+                 'python': platform.python_version(),
+                 'machine': platform.machine()},
+        'results': results,
+        'summary': summarize(results),
+    }
+
+def compare_reports(report: Dict, baseline: Dict, tolerance: float = 0.25) -> List[str]:
+    # A regression is a slower median, more memory, or fewer solved queries
+    regressions = []
+    for engine, scales in report['summary'].items():
+        for scale, entry in scales.items():
+            base = baseline.get('summary', {}).get(engine, {}).get(scale)
+            if base is None:
+                continue
+            if entry['solved'] < base['solved']:
+                regressions.append(f"{engine} n={scale}: solved {entry['solved']} < {base['solved']}")
+            for key in ('median_wall_time', 'max_peak_memory',
+                        'long_route_median_wall_time', 'long_route_max_peak_memory'):
+                if entry.get(key) is not None and base.get(key) and entry[key] > base[key] * (1 + tolerance):
+                    regressions.append(f"{engine} n={scale}: {key} {entry[key]:.4g} > "
+                                       f"{base[key]:.4g} (+{tolerance:.0%})")
+    return regressions
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scales', type=int, nargs='+', default=DEFAULT_SCALES)
+    parser.add_argument('--engines', nargs='+', default=list(ENGINES), choices=list(ENGINES))
+    parser.add_argument('--queries', type=int, default=5, help='pin pairs per board')
+    parser.add_argument('--timeout', type=float, default=10.0, help='seconds per query')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--density', type=float, default=0.15,
+                        help='fraction of board area covered by components')
+    parser.add_argument('--strategy', choices=['dart', 'shelf'], default='dart',
+                        help='component placement strategy (see generator.py)')
+    parser.add_argument('--no-memory', action='store_true', help='skip the traced memory pass')
+    parser.add_argument('--output', default='bench_report.json')
+    parser.add_argument('--baseline', help='report to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args.scales, args.engines, args.queries, args.timeout,
+                           args.seed, measure_memory=not args.no_memory,
+                           density=args.density, strategy=args.strategy)
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(json.dumps(report['summary'], indent=2))
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_reports(report, baseline, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+        print("No regressions against baseline")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
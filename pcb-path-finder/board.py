@@ -0,0 +1,176 @@
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import numpy as np
+from models import Component, Pin, Point
+
+# Search nodes are packed into a single int instead of a Point object.
+# Coordinates are biased so negative values pack and order correctly.
+_BIAS = 1 << 31
+_MASK = (1 << 32) - 1
+
+def pack_point(x: int, y: int) -> int:
+    return ((x + _BIAS) << 32) | (y + _BIAS)
+
+def unpack_point(key: int) -> Tuple[int, int]:
+    return (key >> 32) - _BIAS, (key & _MASK) - _BIAS
+
+class Board:
+    """Column-oriented board: component rectangles and pins as int64 arrays.
+
+    Pins are stored grouped by component, so the pins of component i are
+    rows pin_offsets[i]:pin_offsets[i + 1]. Pin coordinates are relative to
+    their component, as in models.Pin.
+    """
+
+    def __init__(self, comp_x: np.ndarray, comp_y: np.ndarray,
+                 comp_w: np.ndarray, comp_h: np.ndarray,
+                 pin_x: np.ndarray, pin_y: np.ndarray, pin_component: np.ndarray,
+                 pin_offsets: Optional[np.ndarray] = None):
+        self.comp_x = comp_x
+        self.comp_y = comp_y
+        self.comp_w = comp_w
+        self.comp_h = comp_h
+        self.pin_x = pin_x
+        self.pin_y = pin_y
+        self.pin_component = pin_component
+        if pin_offsets is None:
+            counts = np.bincount(pin_component, minlength=len(comp_x))
+            pin_offsets = np.zeros(len(comp_x) + 1, dtype=np.int64)
+            np.cumsum(counts, out=pin_offsets[1:])
+        self.pin_offsets = pin_offsets
+        # Pin identity -> index, filled when built from model objects
+        self._pin_ids: Dict[int, int] = {}
+
+    @classmethod
+    def from_components(cls, components: Iterable[Component]) -> 'Board':
+        components = list(components)
+        comp_x = np.fromiter((c.x for c in components), dtype=np.int64, count=len(components))
+        comp_y = np.fromiter((c.y for c in components), dtype=np.int64, count=len(components))
+        comp_w = np.fromiter((c.width for c in components), dtype=np.int64, count=len(components))
+        comp_h = np.fromiter((c.height for c in components), dtype=np.int64, count=len(components))
+        pins: List[Pin] = []
+        owners: List[int] = []
+        for index, comp in enumerate(components):
+            for pin in comp.pins:
+                pins.append(pin)
+                owners.append(index)
+        board = cls(comp_x, comp_y, comp_w, comp_h,
+                    np.fromiter((p.x for p in pins), dtype=np.int64, count=len(pins)),
+                    np.fromiter((p.y for p in pins), dtype=np.int64, count=len(pins)),
+                    np.asarray(owners, dtype=np.int64))
+        board._pin_ids = {id(pin): index for index, pin in enumerate(pins)}
+        return board
+
+    def __len__(self) -> int:
+        return len(self.comp_x)
+
+    @property
+    def num_pins(self) -> int:
+        return len(self.pin_x)
+
+    def pin_index(self, pin: Pin) -> int:
+        return self._pin_ids[id(pin)]
+
+    def component(self, index: int) -> 'ComponentView':
+        return ComponentView(self, index)
+
+    def pin(self, index: int) -> 'PinView':
+        return PinView(self, index)
+
+    def components(self) -> List['ComponentView']:
+        return [ComponentView(self, i) for i in range(len(self))]
+
+    def pin_positions(self) -> Tuple[np.ndarray, np.ndarray]:
+        # Absolute pin coordinates, vectorized
+        return (self.comp_x[self.pin_component] + self.pin_x,
+                self.comp_y[self.pin_component] + self.pin_y)
+
+    def to_components(self) -> Set[Component]:
+        components = set()
+        for i in range(len(self)):
+            comp = Component(int(self.comp_x[i]), int(self.comp_y[i]),
+                             int(self.comp_w[i]), int(self.comp_h[i]), set())
+            for j in range(self.pin_offsets[i], self.pin_offsets[i + 1]):
+                comp.pins.add(Pin(int(self.pin_x[j]), int(self.pin_y[j]), comp))
+            components.add(comp)
+        return components
+
+class ComponentView:
+    """Read-only Component lookalike backed by a Board row."""
+    __slots__ = ('board', 'index')
+
+    def __init__(self, board: Board, index: int):
+        self.board = board
+        self.index = index
+
+    @property
+    def x(self) -> int:
+        return int(self.board.comp_x[self.index])
+
+    @property
+    def y(self) -> int:
+        return int(self.board.comp_y[self.index])
+
+    @property
+    def width(self) -> int:
+        return int(self.board.comp_w[self.index])
+
+    @property
+    def height(self) -> int:
+        return int(self.board.comp_h[self.index])
+
+    @property
+    def pins(self) -> List['PinView']:
+        start, end = self.board.pin_offsets[self.index], self.board.pin_offsets[self.index + 1]
+        return [PinView(self.board, j) for j in range(start, end)]
+
+    def __eq__(self, other):
+        if not isinstance(other, (Component, ComponentView)):
+            return False
+        return (self.x == other.x and
+                self.y == other.y and
+                self.width == other.width and
+                self.height == other.height)
+
+    def __hash__(self):
+        return hash((self.x, self.y, self.width, self.height))
+
+    def contains_point(self, point: Point) -> bool:
+        return Component.contains_point(self, point)
+
+    def overlaps_box(self, x_min: int, y_min: int, x_max: int, y_max: int) -> bool:
+        return Component.overlaps_box(self, x_min, y_min, x_max, y_max)
+
+    def intersects_segment(self, p1: Point, p2: Point) -> bool:
+        return Component.intersects_segment(self, p1, p2)
+
+class PinView:
+    """Read-only Pin lookalike backed by a Board row."""
+    __slots__ = ('board', 'index')
+
+    def __init__(self, board: Board, index: int):
+        self.board = board
+        self.index = index
+
+    @property
+    def x(self) -> int:
+        return int(self.board.pin_x[self.index])
+
+    @property
+    def y(self) -> int:
+        return int(self.board.pin_y[self.index])
+
+    @property
+    def component(self) -> ComponentView:
+        return ComponentView(self.board, int(self.board.pin_component[self.index]))
+
+    def __eq__(self, other):
+        return isinstance(other, PinView) and self.board is other.board and self.index == other.index
+
+    def __hash__(self):
+        return hash((id(self.board), self.index))
+
+    def get_absolute_position(self) -> Point:
+        return Pin.get_absolute_position(self)
+
+    def exit_direction(self) -> Tuple[int, int]:
+        return Pin.exit_direction(self)
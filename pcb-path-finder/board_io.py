@@ -0,0 +1,102 @@
+"""Binary and JSON board files.
+
+Binary layout, little-endian, every array int64 and 8-byte aligned:
+
+    header    64 bytes: magic b'PCBBOARD', version (uint32), reserved (uint32),
+              component count N (int64), pin count P (int64), zero padding
+    rects     N x 4   x, y, width, height per component
+    offsets   N + 1   pins of component i are rows offsets[i]:offsets[i + 1]
+    pins      P x 2   pin x, y relative to the component
+    owners    P       component index of each pin
+
+load_board memory-maps the file, so the Board columns are views into the
+page cache and no per-component objects are built until asked for.
+"""
+import json
+import struct
+from typing import Iterable, Union
+import numpy as np
+from board import Board
+from models import Component
+
+MAGIC = b'PCBBOARD'
+VERSION = 1
+_HEADER = struct.Struct('<8sIIqq')
+HEADER_SIZE = 64
+
+def _as_board(board: Union[Board, Iterable[Component]]) -> Board:
+    return board if isinstance(board, Board) else Board.from_components(board)
+
+def save_board(board: Union[Board, Iterable[Component]], path: str):
+    board = _as_board(board)
+    n, p = len(board), board.num_pins
+    if p and np.any(np.diff(board.pin_component) < 0):
+        raise ValueError("pins must be grouped by component")
+    header = _HEADER.pack(MAGIC, VERSION, 0, n, p).ljust(HEADER_SIZE, b'\0')
+    columns = [
+        np.stack([board.comp_x, board.comp_y, board.comp_w, board.comp_h], axis=1),
+        board.pin_offsets,
+        np.stack([board.pin_x, board.pin_y], axis=1),
+        board.pin_component,
+    ]
+    with open(path, 'wb') as f:
+        f.write(header)
+        for column in columns:
+            f.write(np.ascontiguousarray(column, dtype='<i8').tobytes())
+
+def load_board(path: str, mmap: bool = True) -> Board:
+    with open(path, 'rb') as f:
+        magic, version, _, n, p = _HEADER.unpack(f.read(_HEADER.size))
+    if magic != MAGIC:
+        raise ValueError(f"{path} is not a board file")
+    if version != VERSION:
+        raise ValueError(f"{path} has unsupported board format version {version}")
+    total = 4 * n + (n + 1) + 2 * p + p
+    if total == 0:
+        data = np.zeros(0, dtype='<i8')  # An empty file region cannot be mapped
+    elif mmap:
+        data = np.memmap(path, dtype='<i8', mode='r', offset=HEADER_SIZE, shape=(total,))
+    else:
+        data = np.fromfile(path, dtype='<i8', count=total, offset=HEADER_SIZE)
+    if len(data) != total:
+        raise ValueError(f"{path} is truncated")
+    rects = data[:4 * n].reshape(n, 4)
+    offsets = data[4 * n:5 * n + 1]
+    pins = data[5 * n + 1:5 * n + 1 + 2 * p].reshape(p, 2)
+    owners = data[5 * n + 1 + 2 * p:]
+    return Board(rects[:, 0], rects[:, 1], rects[:, 2], rects[:, 3],
+                 pins[:, 0], pins[:, 1], owners, pin_offsets=offsets)
+
+def board_to_json(board: Union[Board, Iterable[Component]]) -> dict:
+    board = _as_board(board)
+    components = []
+    for i in range(len(board)):
+        start, end = board.pin_offsets[i], board.pin_offsets[i + 1]
+        components.append({
+            'x': int(board.comp_x[i]),
+            'y': int(board.comp_y[i]),
+            'width': int(board.comp_w[i]),
+            'height': int(board.comp_h[i]),
+            'pins': [[int(x), int(y)] for x, y in zip(board.pin_x[start:end], board.pin_y[start:end])],
+        })
+    return {'version': VERSION, 'components': components}
+
+def board_from_json(data: dict) -> Board:
+    comps = data['components']
+    pins = [pin for comp in comps for pin in comp['pins']]
+    owners = [i for i, comp in enumerate(comps) for _ in comp['pins']]
+    return Board(np.array([c['x'] for c in comps], dtype=np.int64),
+                 np.array([c['y'] for c in comps], dtype=np.int64),
+                 np.array([c['width'] for c in comps], dtype=np.int64),
+                 np.array([c['height'] for c in comps], dtype=np.int64),
+                 np.array([x for x, _ in pins], dtype=np.int64),
+                 np.array([y for _, y in pins], dtype=np.int64),
+                 np.array(owners, dtype=np.int64))
+
+def save_json(board: Union[Board, Iterable[Component]], path: str):
+    with open(path, 'w') as f:
+        json.dump(board_to_json(board), f, indent=1)
+
+def load_json(path: str) -> Board:
+    with open(path) as f:
+        return board_from_json(json.load(f))
@@ -0,0 +1,140 @@
+"""Connected regions of a board's free space, to reject unroutable pairs
+without searching.
+
+The free grid points of every column form runs between the components that
+cross the column. The index stores those runs and joins each one to the runs
+it touches in the next column with union-find, so the work grows with the
+number of runs, not the board's area. Everything outside the components'
+bounding box is one region. A lookup is a binary search in one column's
+runs. A route can exist only when both pins' exit
+points are free and lie in the same region:
+
+    index = ConnectivityIndex(components)
+    if index.can_connect(start_pin, end_pin):
+        path = find_route(components, start_pin, end_pin, connectivity=index)
+
+With the two-unit spacing guarantee all free space is one region, so on such
+boards the check only catches blocked pin exits. It pays off on boards that
+break the guarantee, where a pin can be walled in and every search for it
+would otherwise run until its iteration limit.
+"""
+from bisect import bisect_right
+from typing import Collection, Dict, List, Optional, Tuple
+from models import Component, Pin
+
+class ConnectivityIndex:
+    """Region label for every free grid point of a board, built once."""
+
+    def __init__(self, components: Collection[Component]):
+        components = list(components)
+        # Runs per column: first and last free y, and region number
+        self.starts: List[List[int]] = []
+        self.ends: List[List[int]] = []
+        self.labels: List[List[int]] = []
+        self.region_count = 1
+        if not components:
+            self.bounds = (0, 0, -1, -1)
+            return
+        x_min = min(comp.x for comp in components)
+        y_min = min(comp.y for comp in components)
+        x_max = max(comp.x + comp.width for comp in components)
+        y_max = max(comp.y + comp.height for comp in components)
+        self.bounds = (x_min, y_min, x_max, y_max)
+
+        # Covered spans per column, then the free runs between them. A run
+        # that reaches the bounding box continues outside it.
+        spans: List[List[Tuple[int, int]]] = [[] for _ in range(x_max - x_min + 1)]
+        for comp in components:
+            for x in range(comp.x, comp.x + comp.width + 1):
+                spans[x - x_min].append((comp.y, comp.y + comp.height))
+        starts, ends = [], []
+        for column in spans:
+            column.sort()
+            run_starts, run_ends = [], []
+            y = y_min - 1  # Lowest point not yet known to be covered
+            for lo, hi in column:
+                if lo > y:
+                    run_starts.append(y)
+                    run_ends.append(lo - 1)
+                y = max(y, hi + 1)
+            if y <= y_max + 1:
+                run_starts.append(y)
+                run_ends.append(y_max + 1)
+            starts.append(run_starts)
+            ends.append(run_ends)
+
+        # Run ids are consecutive per column; id 0 stands for the outside
+        parent = [0]
+        first_id = []
+        for run_starts in starts:
+            first_id.append(len(parent))
+            parent.extend(range(len(parent), len(parent) + len(run_starts)))
+
+        def find(i: int) -> int:
+            root = i
+            while parent[root] != root:
+                root = parent[root]
+            while parent[i] != root:
+                parent[i], i = root, parent[i]
+            return root
+
+        def union(a: int, b: int):
+            a, b = find(a), find(b)
+            if a != b:
+                if a < b:
+                    parent[b] = a
+                else:
+                    parent[a] = b
+
+        last = len(starts) - 1
+        for column, (run_starts, run_ends) in enumerate(zip(starts, ends)):
+            base = first_id[column]
+            for i, (lo, hi) in enumerate(zip(run_starts, run_ends)):
+                if lo < y_min or hi > y_max or column in (0, last):
+                    union(0, base + i)
+            if column == last:
+                break
+            # Merge with the next column's runs wherever two runs share a y
+            next_starts, next_ends = starts[column + 1], ends[column + 1]
+            next_base = first_id[column + 1]
+            i = j = 0
+            while i < len(run_starts) and j < len(next_starts):
+                if run_starts[i] <= next_ends[j] and next_starts[j] <= run_ends[i]:
+                    union(base + i, next_base + j)
+                if run_ends[i] < next_ends[j]:
+                    i += 1
+                else:
+                    j += 1
+
+        # Flatten to dense region numbers, 0 being the outside
+        numbers: Dict[int, int] = {find(0): 0}
+        for column, run_starts in enumerate(starts):
+            base = first_id[column]
+            self.labels.append([numbers.setdefault(find(base + i), len(numbers))
+                                for i in range(len(run_starts))])
+        self.starts = starts
+        self.ends = ends
+        self.region_count = len(numbers)
+
+    def region_of(self, x: int, y: int) -> Optional[int]:
+        # Region number of a free grid point, or None when it is covered
+        x_min, y_min, x_max, y_max = self.bounds
+        if not (x_min <= x <= x_max and y_min <= y <= y_max):
+            return 0
+        column = x - x_min
+        i = bisect_right(self.starts[column], y) - 1
+        if i < 0 or y > self.ends[column][i]:
+            return None
+        return self.labels[column][i]
+
+    def exit_region(self, pin: Pin) -> Optional[int]:
+        # Region of the point a route leaves or enters the pin through
+        pos = pin.get_absolute_position()
+        dx, dy = pin.exit_direction()
+        return self.region_of(pos.x + dx, pos.y + dy)
+
+    def can_connect(self, start_pin: Pin, end_pin: Pin) -> bool:
+        # False only when no route can exist; True does not promise one
+        # within a search's distance or iteration limits
+        region = self.exit_region(start_pin)
+        return region is not None and region == self.exit_region(end_pin)
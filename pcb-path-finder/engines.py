@@ -0,0 +1,267 @@
+"""One interface over every routing engine in the repository.
+
+Callers describe a board once with the canonical models.Component/Pin types
+(pins relative to their component, any coordinates) and pick an engine by
+name. Adapters translate the board into each engine's own types and bounds
+and map the path back:
+
+    from engines import get_engine, route
+    path = route(components, start_pin, end_pin, engine='visibility')
+    path, stats = get_engine('o1-jps').route(components, start_pin, end_pin, return_stats=True)
+
+Every engine returns a list of models.Point from the start pin to the end
+pin, empty if it found no route.
+
+An engine may also offer reachability(components), a check built once per
+board that returns can_connect(start_pin, end_pin), False only for pairs the
+engine itself cannot route. Each engine answers under its own obstacle
+model, so batch jobs can skip hopeless pairs without asking the wrong one.
+"""
+import abc
+import functools
+import importlib.util
+import os
+import sys
+from typing import Callable, Collection, Dict, List, Optional
+from models import Component, Pin, Point
+from hierarchical import HierarchicalRouter
+from connectivity import ConnectivityIndex
+from route_cache import board_fingerprint, rect_of
+from router import find_route
+from visibility_router import VisibilityGraph, find_route_visibility
+
+try:
+    from typing import Protocol
+except ImportError:  # Python 3.7
+    from typing_extensions import Protocol
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT_PATHS = {
+    'o1': os.path.join(REPO_ROOT, 'pcb-path-finder-o1', 'main.py'),
+    'gais': os.path.join(REPO_ROOT, 'pcb-path-finder-gais', 'main.py'),
+}
+
+Reachability = Callable[[Pin, Pin], bool]
+
+class Router(Protocol):
+    name: str
+
+    def route(self, components: Collection[Component], start_pin: Pin, end_pin: Pin,
+              return_stats: bool = False):
+        # Returns the path, or (path, RouteStats) when return_stats is set
+        ...
+
+def reachability(router: Router, components: Collection[Component]) -> Optional[Reachability]:
+    # The engine's own pre-search check for this board, or None if it has none
+    build = getattr(router, 'reachability', None)
+    return build(components) if build is not None else None
+
+def _router_reachability(components: Collection[Component]) -> Reachability:
+    # For engines that block grid points exactly as router.find_route does
+    return ConnectivityIndex(components).can_connect
+
+def load_script(name: str):
+    # The o1 and gais engines are standalone scripts, not packages. They are
+    # loaded once on first use; gais needs pygame and o1 needs matplotlib.
+    module_name = f'{name}_engine'
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    os.environ.setdefault('MPLBACKEND', 'Agg')
+    os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+    spec = importlib.util.spec_from_file_location(module_name, SCRIPT_PATHS[name])
+    module = importlib.util.module_from_spec(spec)
+    # dataclasses resolves annotations through sys.modules
+    sys.modules[module_name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[module_name]
+        raise
+    return module
+
+class FunctionRouter:
+    """Adapter for engines that already take the canonical board."""
+
+    def __init__(self, name: str, function: Callable, shares_obstacles: bool = False, **options):
+        # shares_obstacles: the function blocks grid points as router.find_route
+        # does, so the router's connectivity index applies to it
+        self.name = name
+        self.function = function
+        self.options = options
+        if shares_obstacles:
+            self.reachability = _router_reachability
+
+    def route(self, components: Collection[Component], start_pin: Pin, end_pin: Pin,
+              return_stats: bool = False):
+        return self.function(components, start_pin, end_pin, return_stats=return_stats,
+                             **self.options)
+
+class _ConvertingRouter(abc.ABC):
+    # Converts a canonical board to the engine's own types once and reuses it
+    # while the board fingerprint stays the same, so per-query cost is only
+    # the search. Components are matched by rectangle, which the spacing
+    # guarantee makes unique.
+    margin = 2
+
+    def __init__(self):
+        self._fingerprint = None
+        self._prepared = None
+
+    def _board(self, components: Collection[Component]):
+        fingerprint = board_fingerprint(components)
+        if fingerprint != self._fingerprint:
+            self._prepared = self._prepare(list(components))
+            self._fingerprint = fingerprint
+        return self._prepared
+
+    @abc.abstractmethod
+    def _prepare(self, components: List[Component]):
+        # The engine's own form of the board, built once per fingerprint
+        ...
+
+class O1Router(_ConvertingRouter):
+    """o1's grid A*, JPS or Lee wavefront; the board is shifted into o1's 0..board_size square."""
+
+    NAMES = {'a_star': 'o1', 'jps': 'o1-jps', 'lee': 'o1-lee'}
+
+    def __init__(self, search: str = 'a_star'):
+        super().__init__()
+        self.name = self.NAMES[search]
+        self.o1 = load_script('o1')
+        self.search = getattr(self.o1, f'find_path_{search}')
+
+    def _prepare(self, components: List[Component]):
+        o1 = self.o1
+        offset_x = min(c.x for c in components) - self.margin
+        offset_y = min(c.y for c in components) - self.margin
+        size = max(max(c.x + c.width for c in components) - offset_x,
+                   max(c.y + c.height for c in components) - offset_y) + self.margin
+        converted = {}
+        for comp in components:
+            o1_comp = o1.Component(comp.x - offset_x, comp.y - offset_y, comp.width, comp.height, [])
+            # o1 pins are absolute
+            o1_comp.pins = [o1.Pin(o1_comp.x + p.x, o1_comp.y + p.y, o1_comp) for p in comp.pins]
+            converted[rect_of(comp)] = o1_comp
+        board = list(converted.values())
+        return offset_x, offset_y, converted, board, o1.Occupancy(board, board_size=size)
+
+    def _pin(self, converted, pin: Pin):
+        o1_comp = converted[rect_of(pin.component)]
+        return self.o1.Pin(o1_comp.x + pin.x, o1_comp.y + pin.y, o1_comp)
+
+    def reachability(self, components: Collection[Component]) -> Reachability:
+        # Regions of o1's own occupancy, which later routes on the board reuse
+        _, _, converted, _, occupancy = self._board(components)
+        occupancy.regions()
+        exit_direction = self.o1.exit_direction
+
+        def can_connect(start_pin: Pin, end_pin: Pin) -> bool:
+            exits = []
+            for pin in (self._pin(converted, start_pin), self._pin(converted, end_pin)):
+                dx, dy = exit_direction(pin)
+                exits.append((pin.x + dx, pin.y + dy))
+            return occupancy.may_connect(exits[0], exits[1], True)
+        return can_connect
+
+    def route(self, components: Collection[Component], start_pin: Pin, end_pin: Pin,
+              return_stats: bool = False):
+        offset_x, offset_y, converted, board, occupancy = self._board(components)
+        pins = [self._pin(converted, pin) for pin in (start_pin, end_pin)]
+        path, stats = self.search(pins[0], pins[1], board, occupancy=occupancy, return_stats=True)
+        path = [Point(p.x + offset_x, p.y + offset_y) for p in path] if path else []
+        return (path, stats) if return_stats else path
+
+class GaisRouter(_ConvertingRouter):
+    """gais's bend-aware ray search; its ray index is bounded by the board plus a margin."""
+
+    name = 'gais'
+
+    def __init__(self, bend_penalty: float = 10):
+        super().__init__()
+        self.gais = load_script('gais')
+        self.bend_penalty = bend_penalty
+
+    def _prepare(self, components: List[Component]):
+        gais = self.gais
+        converted = {}
+        for comp in components:
+            gais_comp = gais.Component(comp.x, comp.y, comp.width, comp.height)
+            gais_comp.pins = [gais.Pin(p.x, p.y, gais_comp) for p in comp.pins]
+            converted[rect_of(comp)] = gais_comp
+        board = list(converted.values())
+        board_min = min(min(c.x, c.y) for c in components) - self.margin
+        board_max = max(max(c.x + c.width, c.y + c.height) for c in components) + self.margin
+        return converted, board, gais.RayIndex(board, board_min, board_max)
+
+    def route(self, components: Collection[Component], start_pin: Pin, end_pin: Pin,
+              return_stats: bool = False):
+        converted, board, ray_index = self._board(components)
+        pins = [self.gais.Pin(pin.x, pin.y, converted[rect_of(pin.component)])
+                for pin in (start_pin, end_pin)]
+        path, stats = self.gais.find_path(board, pins[0], pins[1], bend_penalty=self.bend_penalty,
+                                          ray_index=ray_index, return_stats=True)
+        path = [Point(p.x, p.y) for p in path]
+        return (path, stats) if return_stats else path
+
+class VisibilityEngine(_ConvertingRouter):
+    """Hanan-grid search; the lines and visibility caches are kept per board."""
+
+    name = 'visibility'
+
+    def _prepare(self, components: List[Component]):
+        return VisibilityGraph(components)
+
+    def reachability(self, components: Collection[Component]) -> Reachability:
+        return _router_reachability(components)
+
+    def route(self, components: Collection[Component], start_pin: Pin, end_pin: Pin,
+              return_stats: bool = False):
+        return find_route_visibility(components, start_pin, end_pin, return_stats=return_stats,
+                                     graph=self._board(components))
+
+class HierarchicalEngine(_ConvertingRouter):
+    """Tile-level global route, then find_route inside its corridor."""
+
+    name = 'hierarchical'
+
+    def _prepare(self, components: List[Component]):
+        return HierarchicalRouter(components)
+
+    def reachability(self, components: Collection[Component]) -> Reachability:
+        return _router_reachability(components)
+
+    def route(self, components: Collection[Component], start_pin: Pin, end_pin: Pin,
+              return_stats: bool = False):
+        return self._board(components).route(start_pin, end_pin, return_stats=return_stats)
+
+# Factories, so script engines are only loaded when first asked for
+ENGINES: Dict[str, Callable[[], Router]] = {
+    'router': functools.partial(FunctionRouter, 'router', find_route, shares_obstacles=True),
+    'router-bidirectional': functools.partial(FunctionRouter, 'router-bidirectional', find_route,
+                                              shares_obstacles=True, bidirectional=True),
+    'visibility': VisibilityEngine,
+    'hierarchical': HierarchicalEngine,
+    'o1': O1Router,
+    'o1-jps': functools.partial(O1Router, 'jps'),
+    'o1-lee': functools.partial(O1Router, 'lee'),
+    'gais': GaisRouter,
+}
+_instances: Dict[str, Router] = {}
+
+def register_engine(name: str, factory: Callable[[], Router]):
+    ENGINES[name] = factory
+    _instances.pop(name, None)
+
+def engine_names() -> List[str]:
+    return list(ENGINES)
+
+def get_engine(name: str) -> Router:
+    # Raises KeyError for an unknown name and ImportError if the engine's
+    # dependencies are missing
+    if name not in _instances:
+        _instances[name] = ENGINES[name]()
+    return _instances[name]
+
+def route(components: Collection[Component], start_pin: Pin, end_pin: Pin,
+          engine: str = 'router', return_stats: bool = False):
+    return get_engine(engine).route(components, start_pin, end_pin, return_stats=return_stats)
@@ -0,0 +1,183 @@
+"""Two-level routing: a global route over coarse tiles, then a detailed
+search restricted to the corridor of tiles it picked.
+
+The board is cut into square tiles. A tile's capacity is the number of its
+grid points that no component covers, and entering a tile costs more the
+less free space it has; a tile with no free point cannot be entered. The
+global route is an A* over this tile graph, which is tiny next to the fine
+grid. router.find_route then searches only the points inside the route's
+tiles, widened by a margin of whole tiles, so the nodes it explores grow
+with the route's length rather than with the board. If the detailed search
+fails the margin is doubled, and after max_margin it falls back to an
+unrestricted find_route.
+
+    router = HierarchicalRouter(components)
+    path = router.route(start_pin, end_pin)
+"""
+import heapq
+import logging
+from typing import Collection, Dict, List, Optional, Set, Tuple
+from models import Component, Pin, Point
+from router import find_route
+from spatial_index import ObstacleIndex
+from stats import FIELDS, PhaseTimer, RouteStats
+
+logger = logging.getLogger(__name__)
+
+Tile = Tuple[int, int]
+
+class TileGraph:
+    """Coarse grid of tile_size by tile_size tiles over a board."""
+
+    def __init__(self, components: Collection[Component], tile_size: int = 16,
+                 congestion_weight: float = 4.0):
+        self.tile_size = tile_size
+        self.area = tile_size * tile_size
+        self.congestion_weight = congestion_weight
+        # Grid points covered by components, per tile; tiles absent are empty
+        self.covered: Dict[Tile, int] = {}
+        size = tile_size
+        x_min = y_min = x_max = y_max = 0
+        for i, comp in enumerate(components):
+            x0, y0 = comp.x, comp.y
+            x1, y1 = comp.x + comp.width, comp.y + comp.height
+            if i == 0:
+                x_min, y_min, x_max, y_max = x0, y0, x1, y1
+            else:
+                x_min, y_min = min(x_min, x0), min(y_min, y0)
+                x_max, y_max = max(x_max, x1), max(y_max, y1)
+            for tx in range(x0 // size, x1 // size + 1):
+                width = min(x1, tx * size + size - 1) - max(x0, tx * size) + 1
+                for ty in range(y0 // size, y1 // size + 1):
+                    height = min(y1, ty * size + size - 1) - max(y0, ty * size) + 1
+                    self.covered[(tx, ty)] = self.covered.get((tx, ty), 0) + width * height
+        # One ring of free tiles around the board to route around its edge
+        self.bounds = (x_min // size - 1, y_min // size - 1, x_max // size + 1, y_max // size + 1)
+
+    def tile_of(self, x: int, y: int) -> Tile:
+        return x // self.tile_size, y // self.tile_size
+
+    def capacity(self, tile: Tile) -> int:
+        return self.area - min(self.area, self.covered.get(tile, 0))
+
+    def cost(self, tile: Tile) -> float:
+        # A tile's width scaled up by how much of it is covered; a half-full
+        # tile with the default weight costs three times an empty one
+        free = self.capacity(tile)
+        if free == 0:
+            return float('inf')
+        crowding = (self.area - free) / free
+        return self.tile_size * (1.0 + self.congestion_weight * min(crowding, 1.0))
+
+    def route(self, start: Tile, goal: Tile) -> List[Tile]:
+        # A* over tiles, Manhattan heuristic in tile widths. The end tiles
+        # hold the pins, so they are always enterable.
+        tx_min, ty_min, tx_max, ty_max = self.bounds
+        size = self.tile_size
+        g_score = {start: 0.0}
+        came_from: Dict[Tile, Tile] = {}
+        open_set = [(0.0, 0, start)]
+        counter = 0
+        while open_set:
+            _, _, current = heapq.heappop(open_set)
+            if current == goal:
+                path = [current]
+                while current in came_from:
+                    current = came_from[current]
+                    path.append(current)
+                return path[::-1]
+            cx, cy = current
+            for neighbor in ((cx + 1, cy), (cx - 1, cy), (cx, cy + 1), (cx, cy - 1)):
+                nx, ny = neighbor
+                if not (tx_min <= nx <= tx_max and ty_min <= ny <= ty_max):
+                    continue
+                step = size if neighbor == goal else self.cost(neighbor)
+                tentative = g_score[current] + step
+                if tentative < g_score.get(neighbor, float('inf')):
+                    g_score[neighbor] = tentative
+                    came_from[neighbor] = current
+                    counter += 1
+                    h = (abs(nx - goal[0]) + abs(ny - goal[1])) * size
+                    heapq.heappush(open_set, (tentative + h, counter, neighbor))
+        return []
+
+def corridor(tiles: List[Tile], margin: int) -> Set[Tile]:
+    # The route's tiles plus every tile within margin of one of them
+    allowed = set()
+    for tx, ty in tiles:
+        for dx in range(-margin, margin + 1):
+            for dy in range(-margin, margin + 1):
+                allowed.add((tx + dx, ty + dy))
+    return allowed
+
+class HierarchicalRouter:
+    """Global tile route, then find_route inside its corridor.
+
+    Build one per board and reuse it: the tile graph and obstacle index
+    are computed once. tile_size must be at least router.STEPS' largest step,
+    so a step never skips over a tile.
+    """
+
+    def __init__(self, components: Collection[Component], tile_size: int = 16,
+                 margin: int = 1, max_margin: int = 8, bidirectional: bool = False):
+        self.components = components
+        self.tiles = TileGraph(components, tile_size)
+        self.obstacles = ObstacleIndex(components)
+        self.margin = margin
+        self.max_margin = max_margin
+        self.bidirectional = bidirectional
+
+    def route(self, start_pin: Pin, end_pin: Pin, return_stats: bool = False,
+              timer: Optional[PhaseTimer] = None):
+        # Returns the path, or (path, RouteStats) when return_stats is set.
+        # The stats sum every detailed attempt, except peak_open, which is
+        # the largest; the tile search is timed as the 'global' phase.
+        stats = RouteStats(timer=timer)
+        tiles = self.tiles
+        with stats.phase('global'):
+            ends = []
+            for pin in (start_pin, end_pin):
+                pos = pin.get_absolute_position()
+                dx, dy = pin.exit_direction()
+                ends.append((tiles.tile_of(pos.x, pos.y), tiles.tile_of(pos.x + dx, pos.y + dy)))
+            global_route = tiles.route(ends[0][1], ends[1][1])
+        if not global_route:
+            logger.debug("No global route, searching without a corridor")
+
+        path: List[Point] = []
+        margin = self.margin
+        while global_route and margin <= self.max_margin:
+            allowed = corridor(global_route, margin)
+            # The pins may sit in a neighbouring tile of their exit points
+            allowed.update(tile for end in ends for tile in end)
+            tile_size = tiles.tile_size
+            path = self._detail(start_pin, end_pin, stats,
+                                lambda x, y: (x // tile_size, y // tile_size) in allowed)
+            if path:
+                break
+            logger.debug("No route inside a corridor of margin %d, widening", margin)
+            margin *= 2
+        if not path:
+            path = self._detail(start_pin, end_pin, stats, None)
+        return (path, stats) if return_stats else path
+
+    def _detail(self, start_pin: Pin, end_pin: Pin, stats: RouteStats, allowed) -> List[Point]:
+        path, attempt = find_route(self.components, start_pin, end_pin,
+                                   bidirectional=self.bidirectional, return_stats=True,
+                                   timer=stats.timer, obstacles=self.obstacles, allowed=allowed)
+        for name in FIELDS:
+            if name == 'peak_open':
+                # A high-water mark: the largest of the attempts, not their sum
+                stats.peak_open = max(stats.peak_open, attempt.peak_open)
+            else:
+                setattr(stats, name, getattr(stats, name) + getattr(attempt, name))
+        for name, seconds in attempt.phase_times.items():
+            stats.phase_times[name] = stats.phase_times.get(name, 0.0) + seconds
+        return path
+
+def find_route_hierarchical(components: Collection[Component], start_pin: Pin, end_pin: Pin,
+                            tile_size: int = 16, return_stats: bool = False,
+                            timer: Optional[PhaseTimer] = None):
+    # One-off convenience; build a HierarchicalRouter to route many pairs
+    return HierarchicalRouter(components, tile_size).route(start_pin, end_pin,
+                                                           return_stats=return_stats, timer=timer)
@@ -0,0 +1,213 @@
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import heapq
+from models import Component, Pin, Point
+from router import DIRECTIONS, simplify_path
+from spatial_index import ObstacleIndex
+from board import pack_point, unpack_point
+
+INF = float('inf')
+
+class IncrementalRouter:
+    """Persistent D* Lite search for one pin pair on a unit grid.
+
+    The search runs backward from the cell outside the end pin, so g(cell) is
+    the distance from a cell to the goal. After a component is moved, added
+    or removed only the cells whose blocked state changed are reconsidered
+    and the repair touches just the part of the search tree that depended on
+    them. Moving the start pin's component moves the search start, which
+    D* Lite absorbs through its key modifier; moving the end pin's component
+    or leaving the grid bounds falls back to a fresh search.
+
+    The router works on private copies of the components and the two pins.
+    move_component never changes the caller's Component, so a set it sits
+    in keeps its hash intact; callers that track the board themselves
+    should move their own component too (out of the set, move, back in).
+    """
+
+    def __init__(self, components: Iterable[Component], start_pin: Pin, end_pin: Pin,
+                 margin: int = 10):
+        # id of the caller's component -> (that component, the router's copy);
+        # holding the original keeps its id from being reused
+        self._copies: Dict[int, Tuple[Component, Component]] = {}
+        self.components: List[Component] = [self._copy(comp) for comp in components]
+        self.start_pin = Pin(start_pin.x, start_pin.y, self._own(start_pin.component))
+        self.end_pin = Pin(end_pin.x, end_pin.y, self._own(end_pin.component))
+        self.margin = margin
+        self.expanded = 0  # Nodes expanded by the last route() call
+        self._reset()
+
+    def _copy(self, comp: Component) -> Component:
+        copy = Component(comp.x, comp.y, comp.width, comp.height, set())
+        self._copies[id(comp)] = (comp, copy)
+        return copy
+
+    def _own(self, comp: Component) -> Component:
+        entry = self._copies.get(id(comp))
+        if entry is None:
+            raise ValueError("component is not on this router's board")
+        return entry[1]
+
+    def _reset(self):
+        self.obstacles = ObstacleIndex(self.components)
+        self.x_min = min(c.x for c in self.components) - self.margin
+        self.y_min = min(c.y for c in self.components) - self.margin
+        self.x_max = max(c.x + c.width for c in self.components) + self.margin
+        self.y_max = max(c.y + c.height for c in self.components) + self.margin
+        self.start = self._exit_cell(self.start_pin)
+        self.goal = self._exit_cell(self.end_pin)
+        self.last_start = self.start
+        self.km = 0
+        self.g: Dict[int, float] = {}
+        self.rhs: Dict[int, float] = {self.goal: 0}
+        # Lazy-deletion heap: an entry is live only if its key matches open_keys
+        self.open: List[tuple] = []
+        self.open_keys: Dict[int, Tuple[float, float]] = {}
+        self._push(self.goal)
+
+    def _exit_cell(self, pin: Pin) -> int:
+        pos = pin.get_absolute_position()
+        dx, dy = pin.exit_direction()
+        return pack_point(pos.x + dx, pos.y + dy)
+
+    def _in_bounds(self, comp: Component) -> bool:
+        return (comp.x > self.x_min and comp.y > self.y_min and
+                comp.x + comp.width < self.x_max and comp.y + comp.height < self.y_max)
+
+    def _free(self, key: int) -> bool:
+        x, y = unpack_point(key)
+        return (self.x_min <= x <= self.x_max and self.y_min <= y <= self.y_max and
+                not self.obstacles.is_blocked_xy(x, y))
+
+    def _neighbors(self, key: int) -> List[int]:
+        x, y = unpack_point(key)
+        return [pack_point(x + dx, y + dy) for dx, dy in DIRECTIONS]
+
+    def _heuristic(self, key: int) -> int:
+        x, y = unpack_point(key)
+        sx, sy = unpack_point(self.start)
+        return abs(x - sx) + abs(y - sy)
+
+    def _key(self, key: int) -> Tuple[float, float]:
+        best = min(self.g.get(key, INF), self.rhs.get(key, INF))
+        return (best + self._heuristic(key) + self.km, best)
+
+    def _push(self, key: int):
+        k = self._key(key)
+        self.open_keys[key] = k
+        heapq.heappush(self.open, (k[0], k[1], key))
+
+    def _top(self) -> Optional[tuple]:
+        while self.open:
+            k1, k2, key = self.open[0]
+            if self.open_keys.get(key) == (k1, k2):
+                return self.open[0]
+            heapq.heappop(self.open)
+        return None
+
+    def _update_vertex(self, key: int):
+        if key != self.goal:
+            best = INF
+            if self._free(key):
+                for neighbor in self._neighbors(key):
+                    if self._free(neighbor):
+                        best = min(best, self.g.get(neighbor, INF) + 1)
+            self.rhs[key] = best
+        self.open_keys.pop(key, None)
+        if self.g.get(key, INF) != self.rhs.get(key, INF):
+            self._push(key)
+
+    def _compute_shortest_path(self):
+        while True:
+            top = self._top()
+            if top is None:
+                break
+            start_key = self._key(self.start)
+            if ((top[0], top[1]) >= start_key and
+                    self.rhs.get(self.start, INF) == self.g.get(self.start, INF)):
+                break
+            k1, k2, key = heapq.heappop(self.open)
+            del self.open_keys[key]
+            self.expanded += 1
+            new_key = self._key(key)
+            if (k1, k2) < new_key:
+                self._push(key)
+            elif self.g.get(key, INF) > self.rhs.get(key, INF):
+                self.g[key] = self.rhs[key]
+                for neighbor in self._neighbors(key):
+                    self._update_vertex(neighbor)
+            else:
+                self.g[key] = INF
+                self._update_vertex(key)
+                for neighbor in self._neighbors(key):
+                    self._update_vertex(neighbor)
+
+    def route(self) -> List[Point]:
+        self.expanded = 0
+        if not (self._free(self.start) and self._free(self.goal)):
+            return []
+        self._compute_shortest_path()
+        if self.g.get(self.start, INF) == INF:
+            return []
+
+        cells = [Point(*unpack_point(self.start))]
+        current = self.start
+        direction = self.start_pin.exit_direction()
+        while current != self.goal:
+            x, y = unpack_point(current)
+            best, best_cost = None, INF
+            # Prefer to keep going straight among equally short moves
+            for dx, dy in sorted(DIRECTIONS, key=lambda d: d != direction):
+                neighbor = pack_point(x + dx, y + dy)
+                cost = self.g.get(neighbor, INF) + 1
+                if cost < best_cost and self._free(neighbor):
+                    best, best_cost, step = neighbor, cost, (dx, dy)
+            if best is None:
+                return []
+            current, direction = best, step
+            cells.append(Point(*unpack_point(current)))
+        return simplify_path([self.start_pin.get_absolute_position()] + cells +
+                             [self.end_pin.get_absolute_position()])
+
+    def _cells(self, x: int, y: int, width: int, height: int) -> Set[int]:
+        return {pack_point(cx, cy)
+                for cx in range(x, x + width + 1) for cy in range(y, y + height + 1)}
+
+    def _apply_change(self, changed: Set[int]):
+        touched = set(changed)
+        for key in changed:
+            touched.update(self._neighbors(key))
+        for key in touched:
+            self._update_vertex(key)
+
+    def move_component(self, comp: Component, x: int, y: int):
+        # Moves the router's copy of comp; comp itself is left as it is
+        comp = self._own(comp)
+        old_cells = self._cells(comp.x, comp.y, comp.width, comp.height)
+        self.obstacles.remove(comp)
+        comp.x, comp.y = x, y
+        self.obstacles.add(comp)
+        if comp is self.end_pin.component or not self._in_bounds(comp):
+            self._reset()
+            return
+        if comp is self.start_pin.component:
+            self.start = self._exit_cell(self.start_pin)
+            self.km += self._heuristic(self.last_start)
+            self.last_start = self.start
+        self._apply_change(old_cells ^ self._cells(comp.x, comp.y, comp.width, comp.height))
+
+    def add_component(self, comp: Component):
+        comp = self._copy(comp)
+        self.components.append(comp)
+        self.obstacles.add(comp)
+        if not self._in_bounds(comp):
+            self._reset()
+            return
+        self._apply_change(self._cells(comp.x, comp.y, comp.width, comp.height))
+
+    def remove_component(self, comp: Component):
+        comp = self._copies.pop(id(comp), (None, None))[1]
+        if comp is None:
+            raise ValueError("component is not on this router's board")
+        self.components = [c for c in self.components if c is not comp]
+        self.obstacles.remove(comp)
+        self._apply_change(self._cells(comp.x, comp.y, comp.width, comp.height))
@@ -1,5 +1,5 @@
 from dataclasses import dataclass
-from typing import List, Set
+from typing import Iterable, List, Set, Tuple
 from random import randint, uniform
 
 @dataclass
@@ -32,6 +32,16 @@ class Pin:
             self.component.y + self.y
         )
     
+    def exit_direction(self) -> Tuple[int, int]:
+        # Outward normal of the side the pin sits on; pins are never on corners
+        if self.x == 0:
+            return (-1, 0)
+        if self.x == self.component.width:
+            return (1, 0)
+        if self.y == 0:
+            return (0, -1)
+        return (0, 1)
+    
     def __eq__(self, other):
         if not isinstance(other, Pin):
             return False
@@ -65,15 +75,24 @@ class Component:
         return (self.x <= point.x <= self.x + self.width and 
                 self.y <= point.y <= self.y + self.height)
     
+    def overlaps_box(self, x_min: int, y_min: int, x_max: int, y_max: int) -> bool:
+        # Closed test: touching the perimeter counts. An orthogonal segment
+        # hits the component exactly when its bounding box does, so this is
+        # the blocking test for segments.
+        return any_overlaps_box((self,), x_min, y_min, x_max, y_max)
+    
     def intersects_segment(self, p1: Point, p2: Point) -> bool:
         # Only handles horizontal or vertical segments
-        if p1.x == p2.x:  # Vertical segment
-            x = p1.x
-            y_min, y_max = min(p1.y, p2.y), max(p1.y, p2.y)
-            return (self.x <= x <= self.x + self.width and
-                    not (y_max < self.y or y_min > self.y + self.height))
-        else:  # Horizontal segment
-            y = p1.y
-            x_min, x_max = min(p1.x, p2.x), max(p1.x, p2.x)
-            return (self.y <= y <= self.y + self.height and
-                    not (x_max < self.x or x_min > self.x + self.width)) 
\ No newline at end of file
+        return self.overlaps_box(min(p1.x, p2.x), min(p1.y, p2.y),
+                                 max(p1.x, p2.x), max(p1.y, p2.y)) 
+
+def any_overlaps_box(components: Iterable[Component], x_min: int, y_min: int,
+                     x_max: int, y_max: int) -> bool:
+    # The one box test behind Component.overlaps_box and
+    # ObstacleIndex.segment_blocked_xy, which passes a whole bucket so its
+    # hot loop pays one call per bucket rather than one per component
+    for comp in components:
+        if (x_min <= comp.x + comp.width and x_max >= comp.x and
+                y_min <= comp.y + comp.height and y_max >= comp.y):
+            return True
+    return False
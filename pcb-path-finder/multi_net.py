@@ -0,0 +1,202 @@
+"""Route many nets on one board without shorts, by negotiated congestion.
+
+This is the PathFinder scheme on top of router.find_route. Each net is a
+(start pin, end pin) pair, and every net is routed on a shared grid of unit
+cells where nets may overlap. A cell that more than one net uses is
+overused, and each pass makes it more expensive in two ways:
+
+- present cost grows with the number of other nets on the cell, and its
+  factor grows every iteration, so sharing gets steadily more expensive;
+- history cost builds up on cells that stay overused from one iteration to
+  the next, so nets learn to leave contested areas to the nets that need them.
+
+After the first pass only the nets that touch an overused cell are ripped up
+and rerouted. That keeps each iteration proportional to the conflict instead
+of the whole board. Routing stops once no cell is shared, when the overuse
+has not improved for patience iterations, or after max_iterations. On one
+layer some netlists cannot be routed without a crossing at all; those end
+with converged False and the remaining conflicts in the last iteration's
+stats:
+
+    result = route_nets(components, nets)
+    print(result.converged, [it.overused_cells for it in result.iterations])
+"""
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Collection, Dict, List, Sequence, Set, Tuple
+from models import Component, Pin, Point
+from board import pack_point
+from router import find_route
+from spatial_index import ObstacleIndex
+
+logger = logging.getLogger(__name__)
+
+# pack_point(x + dx, y + dy) == pack_point(x, y) + dx * _X_UNIT + dy
+_X_UNIT = 1 << 32
+
+@dataclass
+class IterationStats:
+    iteration: int
+    routed_nets: int  # Nets ripped up and routed again this iteration
+    overused_cells: int  # Cells used by more than one net afterwards
+    overuse: int  # Sum over those cells of (nets on the cell - 1)
+    conflicting_nets: int  # Nets still touching an overused cell
+    wirelength: int  # Cells used by all nets together
+    nodes_expanded: int
+    seconds: float
+
+@dataclass
+class MultiNetResult:
+    paths: List[List[Point]]  # One per net, in the order given; empty if unroutable
+    converged: bool  # True when no two nets share a cell
+    iterations: List[IterationStats] = field(default_factory=list)
+    failed: List[int] = field(default_factory=list)  # Nets with no route at all
+    seconds: float = 0.0
+
+def path_cells(path: List[Point]) -> Set[int]:
+    # Packed grid points a path covers, without its two pin ends, which sit
+    # on component edges and belong to the pins rather than the wire
+    cells = set()
+    for a, b in zip(path, path[1:]):
+        dx = (b.x > a.x) - (b.x < a.x)
+        dy = (b.y > a.y) - (b.y < a.y)
+        key = pack_point(a.x, a.y)
+        delta = dx * _X_UNIT + dy
+        for _ in range(abs(b.x - a.x) + abs(b.y - a.y) + 1):
+            cells.add(key)
+            key += delta
+    cells.discard(pack_point(path[0].x, path[0].y))
+    cells.discard(pack_point(path[-1].x, path[-1].y))
+    return cells
+
+class _Congestion:
+    # usage counts the nets on each cell and history is the accumulated
+    # penalty of cells that stayed overused. cost caches the extra cost of
+    # entering each cell that has either, so a search step reads one dict.
+    def __init__(self):
+        self.usage: Dict[int, int] = {}
+        self.history: Dict[int, float] = {}
+        self.cost: Dict[int, float] = {}
+        self.present_factor = 0.0
+
+    def _update(self, key: int):
+        # A cell with n nets and history h costs (1 + h) * (1 + present_factor * n),
+        # less the unit every cell already costs in find_route
+        n = self.usage.get(key, 0)
+        h = self.history.get(key, 0.0)
+        if n or h:
+            self.cost[key] = (1.0 + h) * (1.0 + self.present_factor * n) - 1.0
+        else:
+            self.cost.pop(key, None)
+
+    def add(self, cells: Set[int]):
+        usage = self.usage
+        for key in cells:
+            usage[key] = usage.get(key, 0) + 1
+            self._update(key)
+
+    def remove(self, cells: Set[int]):
+        usage = self.usage
+        for key in cells:
+            if usage[key] == 1:
+                del usage[key]
+            else:
+                usage[key] -= 1
+            self._update(key)
+
+    def overused(self) -> Dict[int, int]:
+        return {key: count for key, count in self.usage.items() if count > 1}
+
+    def negotiate(self, overused: Dict[int, int], history_factor: float, present_factor: float):
+        # Between iterations: charge history to the overused cells and raise
+        # the present factor, then refresh every cached cost
+        history = self.history
+        for key, count in overused.items():
+            history[key] = history.get(key, 0.0) + history_factor * (count - 1)
+        self.present_factor = present_factor
+        for key in set(self.usage) | set(history):
+            self._update(key)
+
+    def segment_cost(self, x: int, y: int, nx: int, ny: int) -> float:
+        # Extra cost of the cells a step enters, past (x, y)
+        cost = self.cost
+        if not cost:
+            return 0.0
+        delta = ((nx > x) - (nx < x)) * _X_UNIT + (ny > y) - (ny < y)
+        key = pack_point(x, y)
+        extra = 0.0
+        for _ in range(abs(nx - x) + abs(ny - y)):
+            key += delta
+            extra += cost.get(key, 0.0)
+        return extra
+
+def route_nets(components: Collection[Component], nets: Sequence[Tuple[Pin, Pin]],
+               max_iterations: int = 50,
+               present_factor: float = 0.5,
+               present_growth: float = 1.5,
+               history_factor: float = 1.0,
+               patience: int = 10,
+               max_expansions: int = 20000,
+               bidirectional: bool = True) -> MultiNetResult:
+    # Nets are routed in the order given. bidirectional picks the search
+    # used for each net; the bidirectional one is much faster on long nets.
+    # max_expansions bounds each search: once congestion makes a detour
+    # dearer than that, the net keeps its previous route for this iteration
+    # instead of flooding the board.
+    began = time.perf_counter()
+    obstacles = ObstacleIndex(components)
+    congestion = _Congestion()
+    paths: List[List[Point]] = [[] for _ in nets]
+    cells: List[Set[int]] = [set() for _ in nets]
+    result = MultiNetResult(paths, converged=False)
+
+    def route_net(i: int) -> int:
+        start_pin, end_pin = nets[i]
+        path, stats = find_route(components, start_pin, end_pin, bidirectional=bidirectional,
+                                 return_stats=True, segment_cost=congestion.segment_cost,
+                                 obstacles=obstacles, max_iterations=max_expansions)
+        if path:
+            paths[i] = path
+            cells[i] = path_cells(path)
+        # A net that finds nothing this time keeps its previous route, if any
+        congestion.add(cells[i])
+        return stats.nodes_expanded
+
+    # The first pass routes every net with no present cost, so each takes
+    # its shortest route and the overlaps show where the board is contested
+    to_route = list(range(len(nets)))
+    best_overuse, best_iteration = None, 0
+    for iteration in range(1, max_iterations + 1):
+        iteration_began = time.perf_counter()
+        routed, expanded = len(to_route), 0
+        for i in to_route:
+            congestion.remove(cells[i])
+            expanded += route_net(i)
+
+        overused = congestion.overused()
+        to_route = [i for i, net_cells in enumerate(cells)
+                    if any(key in overused for key in net_cells)]
+        stats = IterationStats(iteration, routed,
+                               len(overused), sum(overused.values()) - len(overused),
+                               len(to_route), sum(congestion.usage.values()), expanded,
+                               time.perf_counter() - iteration_began)
+        result.iterations.append(stats)
+        logger.debug("Iteration %d: routed %d nets, %d overused cells, %d conflicting nets, "
+                     "%.2f s", iteration, stats.routed_nets, stats.overused_cells,
+                     stats.conflicting_nets, stats.seconds)
+        if not overused:
+            result.converged = True
+            break
+        if best_overuse is None or stats.overuse < best_overuse:
+            best_overuse, best_iteration = stats.overuse, iteration
+        elif iteration - best_iteration >= patience:
+            logger.debug("No improvement in %d iterations, stopping", patience)
+            break
+
+        congestion.negotiate(overused, history_factor,
+                             present_factor * present_growth ** (iteration - 1))
+
+    result.failed = [i for i, path in enumerate(paths) if not path]
+    result.seconds = time.perf_counter() - began
+    return result
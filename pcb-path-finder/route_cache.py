@@ -0,0 +1,224 @@
+from collections import OrderedDict
+from typing import Callable, Hashable, Iterable, List, Optional, Sequence, Tuple
+import functools
+import hashlib
+import inspect
+import struct
+from models import Component, Pin, Point
+from router import find_route
+from stats import RouteStats
+
+Rect = Tuple[int, int, int, int]  # x, y, width, height
+# Fingerprint, start, end and the router settings the path was computed under
+CacheKey = Tuple[int, Tuple[int, int], Tuple[int, int], Hashable]
+
+# Router arguments that do not change the path found, left out of the key
+NEUTRAL_KWARGS = frozenset({'observer', 'observe_every', 'timer', 'obstacles', 'connectivity'})
+
+_FINGERPRINT_MASK = (1 << 64) - 1
+# Rough per-entry cost: key tuples, OrderedDict slot and one small object per
+# path point. Only used to enforce max_bytes, so it need not be exact.
+_ENTRY_BYTES = 240
+_POINT_BYTES = 112
+
+def rect_of(comp) -> Rect:
+    return (comp.x, comp.y, comp.width, comp.height)
+
+def _rect_hash(rect: Rect) -> int:
+    digest = hashlib.blake2b(struct.pack('<4q', *rect), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+def board_fingerprint(components: Iterable) -> int:
+    # Sum of per-rectangle digests: independent of component order and stable
+    # across processes, and a single move can be applied without rehashing
+    # the whole board (see RouteCache.move_component)
+    fingerprint = 0
+    for comp in components:
+        fingerprint = (fingerprint + _rect_hash(rect_of(comp))) & _FINGERPRINT_MASK
+    return fingerprint
+
+def update_fingerprint(fingerprint: int, old_rect: Optional[Rect] = None,
+                       new_rect: Optional[Rect] = None) -> int:
+    if old_rect is not None:
+        fingerprint = (fingerprint - _rect_hash(old_rect)) & _FINGERPRINT_MASK
+    if new_rect is not None:
+        fingerprint = (fingerprint + _rect_hash(new_rect)) & _FINGERPRINT_MASK
+    return fingerprint
+
+class _Entry:
+    __slots__ = ('path', 'extent', 'size')
+
+    def __init__(self, path: tuple, extent: Optional[Rect], size: int):
+        self.path = path
+        self.extent = extent  # x_min, y_min, x_max, y_max of the route, or None for a failure
+        self.size = size
+
+class RouteCache:
+    """LRU cache of routed pin pairs, keyed by board fingerprint and endpoints.
+
+    Works with any engine whose components expose x/y/width/height and whose
+    path points expose x/y, so the o1 and gais engines can share it through
+    lookup() and store(). A pair routed in one direction also answers the
+    reversed pair. Failed routes are cached too but are dropped on any edit,
+    since any move may open a way through.
+    """
+
+    def __init__(self, max_entries: int = 4096, max_bytes: int = 64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries: 'OrderedDict[CacheKey, _Entry]' = OrderedDict()
+        self.bytes_used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def lookup(self, fingerprint: int, start: Tuple[int, int],
+               end: Tuple[int, int], variant: Hashable = ()) -> Optional[list]:
+        # Returns a fresh list, reversed for a reversed-pair hit; None on a miss.
+        # variant names the router settings; paths stored under other
+        # settings never answer.
+        entry = self.entries.get((fingerprint, start, end, variant))
+        if entry is not None:
+            self.entries.move_to_end((fingerprint, start, end, variant))
+            self.hits += 1
+            return list(entry.path)
+        entry = self.entries.get((fingerprint, end, start, variant))
+        if entry is not None:
+            self.entries.move_to_end((fingerprint, end, start, variant))
+            self.hits += 1
+            return list(reversed(entry.path))
+        self.misses += 1
+        return None
+
+    def store(self, fingerprint: int, start: Tuple[int, int], end: Tuple[int, int],
+              path: Sequence, variant: Hashable = ()):
+        key = (fingerprint, start, end, variant)
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.bytes_used -= old.size
+        path = tuple(path)
+        extent = None
+        if path:
+            xs = [p.x for p in path]
+            ys = [p.y for p in path]
+            extent = (min(xs), min(ys), max(xs), max(ys))
+        entry = _Entry(path, extent, _ENTRY_BYTES + _POINT_BYTES * len(path))
+        self.entries[key] = entry
+        self.bytes_used += entry.size
+        while self.entries and (len(self.entries) > self.max_entries or
+                                self.bytes_used > self.max_bytes):
+            _, evicted = self.entries.popitem(last=False)
+            self.bytes_used -= evicted.size
+            self.evictions += 1
+
+    def move_component(self, fingerprint: int, old_rect: Optional[Rect] = None,
+                       new_rect: Optional[Rect] = None) -> int:
+        """Apply a component edit to the routes cached for ``fingerprint``.
+
+        Pass only new_rect for an added component and only old_rect for a
+        removed one. Routes whose bounding box, grown by one unit, touches
+        neither footprint are still collision-free and are carried over to
+        the returned fingerprint in their current LRU position; the others
+        are evicted.
+        """
+        new_fingerprint = update_fingerprint(fingerprint, old_rect, new_rect)
+        footprints = [r for r in (old_rect, new_rect) if r is not None]
+        rebuilt: 'OrderedDict[CacheKey, _Entry]' = OrderedDict()
+        for key, entry in self.entries.items():
+            if key[0] == fingerprint:
+                if entry.extent is None or self._touches(entry.extent, footprints):
+                    self.bytes_used -= entry.size
+                    self.invalidations += 1
+                    continue
+                key = (new_fingerprint,) + key[1:]
+            # A later duplicate of a carried-over key replaces it
+            if key in rebuilt:
+                self.bytes_used -= rebuilt[key].size
+            rebuilt[key] = entry
+        self.entries = rebuilt
+        return new_fingerprint
+
+    @staticmethod
+    def _touches(extent: Rect, footprints: List[Rect]) -> bool:
+        x_min, y_min, x_max, y_max = extent
+        for x, y, width, height in footprints:
+            if (x_min - 1 <= x + width and x_max + 1 >= x and
+                    y_min - 1 <= y + height and y_max + 1 >= y):
+                return True
+        return False
+
+    def clear(self):
+        self.entries.clear()
+        self.bytes_used = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self.entries),
+            'bytes': self.bytes_used,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+        }
+
+@functools.lru_cache(maxsize=None)
+def _defaults(router: Callable) -> dict:
+    try:
+        parameters = inspect.signature(router).parameters.values()
+    except (TypeError, ValueError):
+        return {}
+    return {p.name: p.default for p in parameters if p.default is not inspect.Parameter.empty}
+
+def settings_variant(router: Callable, kwargs: dict) -> Hashable:
+    # The router and its result-changing arguments, with arguments left at
+    # their default dropped so that passing a default explicitly still hits.
+    # Callables such as segment_cost or allowed can depend on state the
+    # cache cannot see, so they are refused rather than keyed by identity.
+    defaults = _defaults(router)
+    settings = []
+    for name, value in sorted(kwargs.items()):
+        if name in NEUTRAL_KWARGS:
+            continue
+        if name in defaults and (value is defaults[name] or
+                                 (not callable(value) and value == defaults[name])):
+            continue
+        if callable(value):
+            raise ValueError(f"cannot cache routes computed with {name}={value!r}")
+        try:
+            hash(value)
+        except TypeError:
+            raise ValueError(f"cannot cache routes computed with unhashable {name}={value!r}")
+        settings.append((name, value))
+    return (router, tuple(settings))
+
+def cached_find_route(cache: RouteCache, components: Iterable[Component],
+                      start_pin: Pin, end_pin: Pin,
+                      fingerprint: Optional[int] = None,
+                      router: Callable[..., List[Point]] = find_route,
+                      return_stats: bool = False,
+                      **kwargs):
+    # Pass a precomputed fingerprint when routing many pairs on one board;
+    # hashing every component on each call costs more than a cache hit saves.
+    # The router and its kwargs are part of the key; kwargs that take a
+    # callable which changes the result raise ValueError.
+    variant = settings_variant(router, kwargs)
+    if fingerprint is None:
+        fingerprint = board_fingerprint(components)
+    start_pos = start_pin.get_absolute_position()
+    end_pos = end_pin.get_absolute_position()
+    start, end = (start_pos.x, start_pos.y), (end_pos.x, end_pos.y)
+    path = cache.lookup(fingerprint, start, end, variant)
+    if path is not None:
+        return (path, RouteStats(cache_hits=1)) if return_stats else path
+    if return_stats:
+        path, stats = router(components, start_pin, end_pin, return_stats=True, **kwargs)
+    else:
+        path = router(components, start_pin, end_pin, **kwargs)
+    cache.store(fingerprint, start, end, path, variant)
+    return (path, stats) if return_stats else path
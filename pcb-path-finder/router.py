@@ -1,9 +1,34 @@
-from typing import List, Set, Optional
+from typing import Callable, Dict, List, Set, Optional, Tuple
 from models import Component, Pin, Point
 from collections import deque
 import heapq
-from visualizer import PathVisualizer
-import matplotlib.pyplot as plt
+import logging
+import time
+from spatial_index import ObstacleIndex
+from board import pack_point, unpack_point
+from stats import PhaseTimer, RouteStats
+from connectivity import ConnectivityIndex
+
+logger = logging.getLogger(__name__)
+
+# Called as observer(current, g_score, opened, expanded, iteration) every
+# observe_every expansions. opened and expanded list the packed integer nodes
+# (board.pack_point) pushed on and taken off the open set since the previous
+# call, so an observer's work per call does not grow with the search.
+SearchObserver = Callable[[Point, Dict[int, float], List[int], List[int], int], None]
+
+# Called as segment_cost(x, y, nx, ny) for each candidate step, in the
+# direction the finished path runs from start to end; the result is added to
+# the step length and must not be negative, so the Manhattan heuristic stays
+# admissible. Used by multi_net for congestion costs.
+SegmentCost = Callable[[int, int, int, int], float]
+
+# Called as allowed(x, y) for each candidate node; nodes it rejects are not
+# searched. Used by hierarchical to keep the search inside a corridor.
+NodeFilter = Callable[[int, int], bool]
+
+STEPS = (1, 2, 3, 5, 8)  # Variable step sizes
+DIRECTIONS = ((0, 1), (1, 0), (0, -1), (-1, 0))  # Only horizontal and vertical
 
 def manhattan_distance(p1: Point, p2: Point) -> int:
     return abs(p1.x - p2.x) + abs(p1.y - p2.y)
@@ -11,96 +36,588 @@ def manhattan_distance(p1: Point, p2: Point) -> int:
 def euclidean_distance(p1: Point, p2: Point) -> float:
     return ((p1.x - p2.x) ** 2 + (p1.y - p2.y) ** 2) ** 0.5
 
-def find_route(components: Set[Component], start_pin: Pin, end_pin: Pin) -> List[Point]:
-    # Create visualizer
-    vis = PathVisualizer(components, start_pin, end_pin)
+def simplify_path(path: List[Point]) -> List[Point]:
+    # Drop repeated points and the interior points of straight runs
+    simplified: List[Point] = []
+    for point in path:
+        if simplified and simplified[-1] == point:
+            continue
+        if len(simplified) >= 2:
+            a, b = simplified[-2], simplified[-1]
+            if (a.x == b.x == point.x) or (a.y == b.y == point.y):
+                simplified[-1] = point
+                continue
+        simplified.append(point)
+    return simplified
+
+def get_neighbors(obstacles: ObstacleIndex, key: int, center: Point,
+                  max_distance: int, allowed: Optional[NodeFilter] = None) -> List[Tuple[int, int]]:
+    # Only orthogonal movements (no diagonals), within max_distance of center
+    # and, when given, accepted by allowed
+    x, y = unpack_point(key)
+    neighbors = []
+    
+    for step in STEPS:
+        for dx, dy in DIRECTIONS:
+            nx, ny = x + dx * step, y + dy * step
+            if (abs(nx - center.x) <= max_distance and 
+                abs(ny - center.y) <= max_distance and
+                (allowed is None or allowed(nx, ny))):
+                # Check if the path to the new point is clear
+                if not obstacles.segment_blocked_xy(x + dx, y + dy, nx, ny):
+                    neighbors.append((pack_point(nx, ny), step))
+    return neighbors
+
+def find_route(components: Set[Component], start_pin: Pin, end_pin: Pin,
+               observer: Optional[SearchObserver] = None,
+               observe_every: int = 50,
+               bidirectional: bool = False,
+               return_stats: bool = False,
+               timer: Optional[PhaseTimer] = None,
+               segment_cost: Optional[SegmentCost] = None,
+               obstacles: Optional[ObstacleIndex] = None,
+               max_iterations: int = 100000,
+               allowed: Optional[NodeFilter] = None,
+               connectivity: Optional[ConnectivityIndex] = None):
+    # Returns the path, or (path, RouteStats) when return_stats is set.
+    # obstacles may be a prebuilt ObstacleIndex of components, to share one
+    # index across many routes on the same board. With a ConnectivityIndex of
+    # the board, pins whose exits lie in different free regions fail at once.
+    stats = RouteStats(timer=timer)
+    if connectivity is not None and not connectivity.can_connect(start_pin, end_pin):
+        logger.debug("Pins lie in different free regions, no path")
+        return ([], stats) if return_stats else []
+    if bidirectional:
+        path = find_route_bidirectional(components, start_pin, end_pin, observer, observe_every,
+                                        max_iterations=max_iterations, stats=stats,
+                                        segment_cost=segment_cost, obstacles=obstacles,
+                                        allowed=allowed)
+        return (path, stats) if return_stats else path
+    
     path = []
+    debug = logger.isEnabledFor(logging.DEBUG)
     
-    def is_valid_point(point: Point) -> bool:
-        # Check if point is at least 1 unit away from all components
-        for comp in components:
-            if (comp.x <= point.x <= comp.x + comp.width and 
-                comp.y <= point.y <= comp.y + comp.height):
-                return False
-        return True
-    
-    def get_neighbors(point: Point) -> List[Point]:
-        # Only orthogonal movements (no diagonals)
-        steps = [1, 2, 3, 5, 8]  # Variable step sizes
-        directions = [(0, 1), (1, 0), (0, -1), (-1, 0)]  # Only horizontal and vertical
-        neighbors = []
+    with stats.phase('setup'):
+        if obstacles is None:
+            obstacles = ObstacleIndex(components)
+        checks_before = obstacles.checks
         
-        for step in steps:
-            for dx, dy in directions:
-                new_point = Point(point.x + dx * step, point.y + dy * step)
-                if (abs(new_point.x - start_pos.x) <= max_distance and 
-                    abs(new_point.y - start_pos.y) <= max_distance and
-                    is_valid_point(new_point)):
-                    # Check if the path to the new point is clear
-                    if all(is_valid_point(Point(
-                        point.x + dx * i if dx != 0 else point.x,
-                        point.y + dy * i if dy != 0 else point.y))
-                        for i in range(1, step + 1)):
-                        neighbors.append((new_point, step))
+        start_pos = start_pin.get_absolute_position()
+        end_pos = end_pin.get_absolute_position()
         
-        if not neighbors:
-            print(f"No valid neighbors found for point ({point.x}, {point.y})")
-        return neighbors
-    
-    start_pos = start_pin.get_absolute_position()
-    end_pos = end_pin.get_absolute_position()
-    
-    print(f"Searching for path from ({start_pos.x}, {start_pos.y}) to ({end_pos.x}, {end_pos.y})")
-    print(f"Manhattan distance: {manhattan_distance(start_pos, end_pos)}")
-    
-    # Increase search distance
-    max_distance = manhattan_distance(start_pos, end_pos) * 5
-    
-    # A* search
-    counter = 0
-    open_set = [(0, counter, start_pos)]
-    came_from = {}
-    g_score = {start_pos: 0.0}
-    f_score = {start_pos: manhattan_distance(start_pos, end_pos)}  # Use manhattan for heuristic
+        logger.debug("Searching for path from (%d, %d) to (%d, %d), Manhattan distance %d",
+                     start_pos.x, start_pos.y, end_pos.x, end_pos.y,
+                     manhattan_distance(start_pos, end_pos))
+        
+        # Increase search distance
+        max_distance = manhattan_distance(start_pos, end_pos) * 5
+        
+        # A* search over packed integer nodes
+        start_key = pack_point(start_pos.x, start_pos.y)
+        counter = 0
+        open_set = [(0, counter, start_key)]
+        came_from = {}
+        g_score = {start_key: 0.0}
+        opened, expanded = [start_key], []
     
     iterations = 0
-    max_iterations = 100000
+    generated = 0
+    peak_open = 1
+    goal = None
     
-    while open_set and iterations < max_iterations:
-        iterations += 1
-        current = heapq.heappop(open_set)[2]
-        
-        # Update visualization more frequently
-        if iterations % 50 == 0:
-            vis.update(current, set(g_score.keys()), g_score, open_set, iterations, show=True)
-        
-        if iterations % 1000 == 0:
-            print(f"Iteration {iterations}, explored {len(g_score)} points, queue size {len(open_set)}")
-        
-        if manhattan_distance(current, end_pos) < 2:  # Relax end condition slightly
-            path = []
+    with stats.phase('search'):
+        while open_set and iterations < max_iterations:
+            iterations += 1
+            current = heapq.heappop(open_set)[2]
+            cx, cy = unpack_point(current)
+            
+            # Sample the search for observers such as PathVisualizer
+            if observer is not None:
+                expanded.append(current)
+                if iterations % observe_every == 0:
+                    observer(Point(cx, cy), g_score, opened, expanded, iterations)
+                    opened, expanded = [], []
+            
+            if debug and iterations % 1000 == 0:
+                logger.debug("Iteration %d, explored %d points, queue size %d",
+                             iterations, len(g_score), len(open_set))
+            
+            if abs(cx - end_pos.x) + abs(cy - end_pos.y) < 2:  # Relax end condition slightly
+                goal = current
+                break
+            
+            neighbors = get_neighbors(obstacles, current, start_pos, max_distance, allowed)
+            generated += len(neighbors)
+            if debug and not neighbors:
+                logger.debug("No valid neighbors found for point (%d, %d)", cx, cy)
+            
+            for neighbor, cost in neighbors:
+                if segment_cost is not None:
+                    cost += segment_cost(cx, cy, *unpack_point(neighbor))
+                tentative_g_score = g_score[current] + cost
+                
+                if neighbor not in g_score or tentative_g_score < g_score[neighbor]:
+                    came_from[neighbor] = current
+                    g_score[neighbor] = tentative_g_score
+                    nx, ny = unpack_point(neighbor)
+                    f_score = tentative_g_score + abs(nx - end_pos.x) + abs(ny - end_pos.y)
+                    counter += 1
+                    heapq.heappush(open_set, (f_score, counter, neighbor))
+                    if observer is not None:
+                        opened.append(neighbor)
+            if len(open_set) > peak_open:
+                peak_open = len(open_set)
+    
+    with stats.phase('reconstruction'):
+        if goal is not None:
+            current = goal
             while current in came_from:
-                path.append(current)
+                path.append(Point(*unpack_point(current)))
                 current = came_from[current]
             path.append(start_pos)
-            print(f"Path found after {iterations} iterations")
+            logger.debug("Path found after %d iterations", iterations)
             path = path[::-1]
             path.append(end_pos)  # Add final point
-            return path
+        else:
+            logger.debug("Path finding stopped after %d iterations, open set size %d, "
+                         "%d points explored", iterations, len(open_set), len(g_score))
+    
+    stats.nodes_expanded = iterations
+    stats.heap_pops = iterations
+    stats.nodes_generated = generated
+    stats.heap_pushes = counter + 1
+    stats.peak_open = peak_open
+    stats.obstacle_checks = obstacles.checks - checks_before
+    return (path, stats) if return_stats else path
+
+def find_route_bidirectional(components: Set[Component], start_pin: Pin, end_pin: Pin,
+                             observer: Optional[SearchObserver] = None,
+                             observe_every: int = 50,
+                             max_iterations: int = 100000,
+                             stats: Optional[RouteStats] = None,
+                             segment_cost: Optional[SegmentCost] = None,
+                             obstacles: Optional[ObstacleIndex] = None,
+                             allowed: Optional[NodeFilter] = None) -> List[Point]:
+    # Fills stats in place when one is passed; find_route(..., bidirectional=True,
+    # return_stats=True) is the usual way to get it
+    if stats is None:
+        stats = RouteStats()
+    
+    with stats.phase('setup'):
+        if obstacles is None:
+            obstacles = ObstacleIndex(components)
+        checks_before = obstacles.checks
+        start_pos = start_pin.get_absolute_position()
+        end_pos = end_pin.get_absolute_position()
+        max_distance = manhattan_distance(start_pos, end_pos) * 5
+        
+        # Each side starts one unit outside its pin along the pin's outward normal,
+        # so the stitched path leaves and enters both components perpendicularly
+        sources = []
+        for pin, pos in ((start_pin, start_pos), (end_pin, end_pos)):
+            dx, dy = pin.exit_direction()
+            if obstacles.is_blocked_xy(pos.x + dx, pos.y + dy):
+                logger.debug("Pin at (%d, %d) has no free exit", pos.x, pos.y)
+                stats.obstacle_checks = obstacles.checks - checks_before
+                return []
+            sources.append((pos.x + dx, pos.y + dy))
+        
+        logger.debug("Bidirectional search from (%d, %d) to (%d, %d)",
+                     start_pos.x, start_pos.y, end_pos.x, end_pos.y)
         
-        for neighbor, cost in get_neighbors(current):
-            tentative_g_score = g_score[current] + cost
+        # Index 0 searches forward from the start exit, index 1 backward from the end
+        # exit. Both use the balanced potential p(v) = (h_end(v) - h_start(v)) / 2
+        # (negated for the backward side), which keeps reduced edge costs
+        # non-negative in both directions so the frontiers meet near the middle.
+        (sx, sy), (ex, ey) = sources
+        
+        def potential(x: int, y: int) -> float:
+            return ((abs(x - ex) + abs(y - ey)) - (abs(x - sx) + abs(y - sy))) / 2
+        
+        signs = (1, -1)
+        g_scores = [{}, {}]
+        parents = [{}, {}]
+        open_sets = [[], []]
+        opened, expanded = [pack_point(*source) for source in sources], []
+        counter = 0
+        for side in (0, 1):
+            key = pack_point(*sources[side])
+            g_scores[side][key] = 1  # The step out of the pin
+            open_sets[side].append((1 + signs[side] * potential(*sources[side]), -1, counter, key))
+            counter += 1
+        
+        # best is the cheapest start-to-end cost seen where the two searches touch
+        best = float('inf')
+        meeting = None
+        start_key = pack_point(sx, sy)
+        if start_key in g_scores[1]:
+            best, meeting = g_scores[0][start_key] + g_scores[1][start_key], start_key
+    
+    iterations = 0
+    pops = 0
+    generated = 0
+    peak_open = 2
+    with stats.phase('search'):
+        while open_sets[0] and open_sets[1] and iterations < max_iterations:
+            # The potentials cancel along any path, so the two smallest keys bound
+            # every connection through unexpanded nodes from below
+            if open_sets[0][0][0] + open_sets[1][0][0] >= best:
+                break
+            side = 0 if open_sets[0][0][0] <= open_sets[1][0][0] else 1
+            key_value, _, _, current = heapq.heappop(open_sets[side])
+            pops += 1
+            g_score, other_g = g_scores[side], g_scores[1 - side]
+            sign = signs[side]
+            cx, cy = unpack_point(current)
+            if key_value > g_score[current] + sign * potential(cx, cy):
+                continue  # Stale heap entry
+            iterations += 1
             
-            if neighbor not in g_score or tentative_g_score < g_score[neighbor]:
-                came_from[neighbor] = current
+            if observer is not None:
+                expanded.append(current)
+                if iterations % observe_every == 0:
+                    observer(Point(cx, cy), g_score, opened, expanded, iterations)
+                    opened, expanded = [], []
+            
+            neighbors = get_neighbors(obstacles, current, start_pos, max_distance, allowed)
+            generated += len(neighbors)
+            for neighbor, cost in neighbors:
+                nx, ny = unpack_point(neighbor)
+                if segment_cost is not None:
+                    # The backward side walks the path in reverse, so its
+                    # step runs from neighbor to current
+                    cost += segment_cost(cx, cy, nx, ny) if side == 0 else segment_cost(nx, ny, cx, cy)
+                tentative_g_score = g_score[current] + cost
+                if neighbor not in g_score or tentative_g_score < g_score[neighbor]:
+                    g_score[neighbor] = tentative_g_score
+                    parents[side][neighbor] = current
+                    counter += 1
+                    # Among equal keys, expand the deepest node first: in the L1
+                    # metric whole rectangles share a key, and diving through them
+                    # is what lets the frontiers meet early
+                    heapq.heappush(open_sets[side],
+                                   (tentative_g_score + sign * potential(nx, ny), -tentative_g_score,
+                                    counter, neighbor))
+                    if observer is not None:
+                        opened.append(neighbor)
+                    if neighbor in other_g and tentative_g_score + other_g[neighbor] < best:
+                        best = tentative_g_score + other_g[neighbor]
+                        meeting = neighbor
+            if len(open_sets[0]) + len(open_sets[1]) > peak_open:
+                peak_open = len(open_sets[0]) + len(open_sets[1])
+    
+    stats.nodes_expanded = iterations
+    stats.heap_pops = pops
+    stats.nodes_generated = generated
+    stats.heap_pushes = counter
+    stats.peak_open = peak_open
+    stats.obstacle_checks = obstacles.checks - checks_before
+    
+    if meeting is None:
+        logger.debug("Bidirectional search stopped after %d iterations without meeting", iterations)
+        return []
+    
+    logger.debug("Path found after %d iterations", iterations)
+    with stats.phase('reconstruction'):
+        # Stitch: start pin -> forward parents -> meeting node -> backward parents -> end pin
+        forward = []
+        key = meeting
+        while key in parents[0]:
+            forward.append(Point(*unpack_point(key)))
+            key = parents[0][key]
+        forward.append(Point(*unpack_point(key)))
+        backward = []
+        key = meeting
+        while key in parents[1]:
+            key = parents[1][key]
+            backward.append(Point(*unpack_point(key)))
+    return [start_pos] + forward[::-1] + backward + [end_pos]
+
+def find_route_anytime(components: Set[Component], start_pin: Pin, end_pin: Pin,
+                       deadline: Optional[float] = None,
+                       max_nodes: Optional[int] = None,
+                       epsilon: float = 3.0,
+                       epsilon_step: float = 0.5,
+                       on_improve: Optional[Callable[[List[Point], float], None]] = None,
+                       observer: Optional[SearchObserver] = None,
+                       observe_every: int = 50,
+                       return_stats: bool = False,
+                       timer: Optional[PhaseTimer] = None,
+                       obstacles: Optional[ObstacleIndex] = None):
+    # Anytime Repairing A* (ARA*). A weighted search with heuristic weight
+    # epsilon finds a path quickly, at most epsilon times longer than the
+    # shortest; epsilon then drops by epsilon_step and the search resumes,
+    # reusing its work, until it reaches 1 (shortest path) or runs out of
+    # budget. deadline is in seconds from the call and max_nodes caps the
+    # g_score and open set entries together. Either limit returns the best
+    # path found so far, empty if none yet. on_improve(path, epsilon) is
+    # called with each better path. Returns the path, or (path, RouteStats)
+    # when return_stats is set.
+    began = time.perf_counter()
+    stats = RouteStats(timer=timer)
+    best: List[Point] = []
+    best_cost = float('inf')
+    
+    with stats.phase('setup'):
+        if obstacles is None:
+            obstacles = ObstacleIndex(components)
+        checks_before = obstacles.checks
+        start_pos = start_pin.get_absolute_position()
+        end_pos = end_pin.get_absolute_position()
+        max_distance = manhattan_distance(start_pos, end_pos) * 5
+        # Search to the cell just outside the end pin, so the last segment
+        # enters it perpendicularly; the first step is forced the same way
+        # because the start pin's own edges are blocked
+        dx, dy = end_pin.exit_direction()
+        gx, gy = end_pos.x + dx, end_pos.y + dy
+        if obstacles.is_blocked_xy(gx, gy):
+            logger.debug("Pin at (%d, %d) has no free exit", end_pos.x, end_pos.y)
+            stats.obstacle_checks = obstacles.checks - checks_before
+            return (best, stats) if return_stats else best
+        goal = pack_point(gx, gy)
+        start_key = pack_point(start_pos.x, start_pos.y)
+        g_score = {start_key: 0.0}
+        came_from = {}
+        open_nodes = {start_key}
+        closed = set()
+        inconsistent = set()
+        counter = 0
+        open_set = [(epsilon * (abs(start_pos.x - gx) + abs(start_pos.y - gy)), counter, 0.0, start_key)]
+        opened, expanded = [start_key], []
+    
+    iterations = pops = generated = 0
+    peak_open = 1
+    out_of_budget = False
+    with stats.phase('search'):
+        while True:
+            # Expand until no open node could lead to a path cheaper than the
+            # current one at this epsilon
+            while open_set and open_set[0][0] < g_score.get(goal, float('inf')):
+                _, _, g, current = heapq.heappop(open_set)
+                pops += 1
+                if current not in open_nodes or g != g_score[current]:
+                    continue  # Stale heap entry
+                open_nodes.discard(current)
+                closed.add(current)
+                iterations += 1
+                cx, cy = unpack_point(current)
+                
+                if observer is not None:
+                    expanded.append(current)
+                    if iterations % observe_every == 0:
+                        observer(Point(cx, cy), g_score, opened, expanded, iterations)
+                        opened, expanded = [], []
+                
+                neighbors = get_neighbors(obstacles, current, start_pos, max_distance)
+                generated += len(neighbors)
+                for neighbor, cost in neighbors:
+                    tentative_g_score = g + cost
+                    if tentative_g_score < g_score.get(neighbor, float('inf')):
+                        g_score[neighbor] = tentative_g_score
+                        came_from[neighbor] = current
+                        if neighbor in closed:
+                            # Already expanded at this epsilon; revisited next round
+                            inconsistent.add(neighbor)
+                        else:
+                            nx, ny = unpack_point(neighbor)
+                            counter += 1
+                            open_nodes.add(neighbor)
+                            heapq.heappush(open_set, (tentative_g_score + epsilon * (abs(nx - gx) + abs(ny - gy)),
+                                                      counter, tentative_g_score, neighbor))
+                            if observer is not None:
+                                opened.append(neighbor)
+                if len(open_set) > peak_open:
+                    peak_open = len(open_set)
+                if max_nodes is not None and len(g_score) + len(open_set) > max_nodes:
+                    logger.debug("Stopping at the node limit of %d", max_nodes)
+                    out_of_budget = True
+                    break
+                if deadline is not None and iterations % 128 == 0 and \
+                        time.perf_counter() - began > deadline:
+                    logger.debug("Stopping at the %.3f s deadline", deadline)
+                    out_of_budget = True
+                    break
+            if out_of_budget:
+                break
+            
+            if g_score.get(goal, float('inf')) < best_cost:
+                key = goal
+                path = [end_pos]
+                while key in came_from:
+                    path.append(Point(*unpack_point(key)))
+                    key = came_from[key]
+                path.append(start_pos)
+                best = path[::-1]
+                best_cost = g_score[goal]
+                logger.debug("Path of length %d found at epsilon %.2f after %d iterations",
+                             g_score[goal] + 1, epsilon, iterations)
+                if on_improve is not None:
+                    on_improve(best, epsilon)
+            if epsilon <= 1.0 or not best:
+                break
+            
+            # Next round: lower epsilon, reopen the inconsistent nodes and
+            # re-key the open set for the new weight
+            epsilon = max(1.0, epsilon - epsilon_step)
+            if observer is not None:
+                opened.extend(inconsistent)
+            open_nodes |= inconsistent
+            inconsistent.clear()
+            closed.clear()
+            open_set = []
+            for key in open_nodes:
+                nx, ny = unpack_point(key)
+                counter += 1
+                open_set.append((g_score[key] + epsilon * (abs(nx - gx) + abs(ny - gy)),
+                                 counter, g_score[key], key))
+            heapq.heapify(open_set)
+    
+    stats.nodes_expanded = iterations
+    stats.heap_pops = pops
+    stats.nodes_generated = generated
+    stats.heap_pushes = counter + 1
+    stats.peak_open = peak_open
+    stats.obstacle_checks = obstacles.checks - checks_before
+    return (best, stats) if return_stats else best
+
+def search_from(obstacles: ObstacleIndex, sources: Dict[int, float], targets: Set[int],
+                center: Point, max_distance: int, stop_at_first: bool = False,
+                max_iterations: int = 1000000, stats: Optional[RouteStats] = None,
+                target_distances: Optional[Dict[int, int]] = None):
+    # Search from every source at once (packed keys mapped to their starting
+    # cost) until each target key is settled, or the first one when
+    # stop_at_first. Returns (settled targets in order, g_score, came_from);
+    # a source has no came_from entry. Counters are added to stats.
+    #
+    # This is A* towards the nearest unsettled target: the smallest Manhattan
+    # distance to any of them is a consistent heuristic, so every node is
+    # settled at its shortest distance. When a target settles the heuristic
+    # can only grow, and the open set is re-keyed for the targets left.
+    # target_distances optionally gives each target its own window around
+    # center; the search then keeps to the largest window among the targets
+    # left, instead of max_distance throughout.
+    if stats is None:
+        stats = RouteStats()
+    checks_before = obstacles.checks
+    remaining = set(targets)
+    goals = [unpack_point(key) for key in remaining]
+    
+    def heuristic(x: int, y: int) -> int:
+        return min(abs(x - tx) + abs(y - ty) for tx, ty in goals) if goals else 0
+    
+    def window() -> int:
+        if target_distances is None or not remaining:
+            return max_distance
+        return max(target_distances[key] for key in remaining)
+    
+    g_score = dict(sources)
+    came_from: Dict[int, int] = {}
+    open_set = [(g + heuristic(*unpack_point(key)), -g, i, key) for i, (key, g) in enumerate(sources.items())]
+    heapq.heapify(open_set)
+    counter = len(open_set)
+    closed = set()
+    settled = []
+    distance = window()
+    iterations = pops = generated = 0
+    peak_open = len(open_set)
+    
+    while open_set and remaining and iterations < max_iterations:
+        current = heapq.heappop(open_set)[3]
+        pops += 1
+        if current in closed:
+            continue  # Stale heap entry
+        cx, cy = unpack_point(current)
+        if abs(cx - center.x) > distance or abs(cy - center.y) > distance:
+            continue  # Outside the window once the targets that needed it settled
+        closed.add(current)
+        iterations += 1
+        if current in remaining:
+            remaining.discard(current)
+            settled.append(current)
+            if stop_at_first or not remaining:
+                break
+            goals = [unpack_point(key) for key in remaining]
+            distance = window()
+            waiting = {key: order for _, _, order, key in open_set if key not in closed}
+            open_set = [(g_score[key] + heuristic(*unpack_point(key)), -g_score[key], order, key)
+                        for key, order in waiting.items()]
+            heapq.heapify(open_set)
+        
+        g = g_score[current]
+        neighbors = get_neighbors(obstacles, current, center, distance)
+        generated += len(neighbors)
+        for neighbor, cost in neighbors:
+            tentative_g_score = g + cost
+            if tentative_g_score < g_score.get(neighbor, float('inf')):
                 g_score[neighbor] = tentative_g_score
-                f_score = tentative_g_score + manhattan_distance(neighbor, end_pos)
+                came_from[neighbor] = current
                 counter += 1
-                heapq.heappush(open_set, (f_score, counter, neighbor))
+                # Among equal keys, expand the deepest node first, as the
+                # bidirectional search does
+                heapq.heappush(open_set, (tentative_g_score + heuristic(*unpack_point(neighbor)),
+                                          -tentative_g_score, counter, neighbor))
+        if len(open_set) > peak_open:
+            peak_open = len(open_set)
+    
+    stats.nodes_expanded += iterations
+    stats.heap_pops += pops
+    stats.nodes_generated += generated
+    stats.heap_pushes += counter
+    stats.peak_open = max(stats.peak_open, peak_open)
+    stats.obstacle_checks += obstacles.checks - checks_before
+    return settled, g_score, came_from
+
+def trace_back(came_from: Dict[int, int], key: int) -> List[Point]:
+    # Nodes from the source a search reached key from, through key
+    path = [Point(*unpack_point(key))]
+    while key in came_from:
+        key = came_from[key]
+        path.append(Point(*unpack_point(key)))
+    return path[::-1]
+
+def find_routes_from(components: Set[Component], start_pin: Pin, end_pins: List[Pin],
+                     return_stats: bool = False,
+                     timer: Optional[PhaseTimer] = None,
+                     obstacles: Optional[ObstacleIndex] = None):
+    # One search from start_pin to every pin in end_pins, for fan-out nets.
+    # Returns a path per end pin, in order and empty where there is none,
+    # or (paths, RouteStats) when return_stats is set. Paths leave and enter
+    # the pins perpendicularly and are as short as find_route's.
+    stats = RouteStats(timer=timer)
+    paths: List[List[Point]] = [[] for _ in end_pins]
+    
+    with stats.phase('setup'):
+        if obstacles is None:
+            obstacles = ObstacleIndex(components)
+        start_pos = start_pin.get_absolute_position()
+        dx, dy = start_pin.exit_direction()
+        source = pack_point(start_pos.x + dx, start_pos.y + dy)
+        
+        # Exit cell of each end pin -> indices of the pins that leave through it,
+        # and the search window find_route would use for that pin
+        exits: Dict[int, List[int]] = {}
+        windows: Dict[int, int] = {}
+        for i, pin in enumerate(end_pins):
+            pos = pin.get_absolute_position()
+            ex, ey = pin.exit_direction()
+            if obstacles.is_blocked_xy(pos.x + ex, pos.y + ey):
+                continue
+            key = pack_point(pos.x + ex, pos.y + ey)
+            exits.setdefault(key, []).append(i)
+            windows[key] = max(windows.get(key, 0), manhattan_distance(start_pos, pos) * 5)
+        if obstacles.is_blocked_xy(start_pos.x + dx, start_pos.y + dy):
+            logger.debug("Pin at (%d, %d) has no free exit", start_pos.x, start_pos.y)
+            exits = {}
     
-    print(f"Path finding stopped after {iterations} iterations")
-    print(f"Open set size: {len(open_set)}")
-    print(f"Number of points explored: {len(g_score)}")
+    with stats.phase('search'):
+        settled, _, came_from = search_from(obstacles, {source: 1}, set(exits), start_pos,
+                                            max(windows.values(), default=0), stats=stats,
+                                            target_distances=windows)
+    logger.debug("Reached %d of %d end pins", sum(len(exits[key]) for key in settled), len(end_pins))
     
-    vis.show_final_path(path)
-    return path 
\ No newline at end of file
+    with stats.phase('reconstruction'):
+        for key in settled:
+            trunk = [start_pos] + trace_back(came_from, key)
+            for i in exits[key]:
+                paths[i] = trunk + [end_pins[i].get_absolute_position()]
+    return (paths, stats) if return_stats else paths
@@ -0,0 +1,78 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+from models import Component, Point, any_overlaps_box
+
+class ObstacleIndex:
+    """Uniform bucket grid over component rectangles.
+
+    Built once per board; answers point and orthogonal segment queries by
+    testing only the components registered in the buckets the query touches.
+    """
+
+    def __init__(self, components: Iterable[Component], cell_size: Optional[int] = None):
+        components = list(components)
+        if cell_size is None:
+            # Buckets about the size of an average component keep each
+            # component in a handful of cells and each cell nearly empty.
+            if components:
+                total = sum(max(comp.width, comp.height) for comp in components)
+                cell_size = max(4, total // len(components) + 2)
+            else:
+                cell_size = 16
+        self.cell_size = cell_size
+        self.checks = 0  # Point and segment queries answered, for RouteStats
+        self.buckets: Dict[Tuple[int, int], List[Component]] = {}
+        for comp in components:
+            self.add(comp)
+
+    def _cell_range(self, x_min: int, y_min: int, x_max: int, y_max: int):
+        size = self.cell_size
+        for cx in range(x_min // size, x_max // size + 1):
+            for cy in range(y_min // size, y_max // size + 1):
+                yield cx, cy
+
+    def add(self, comp: Component):
+        for cell in self._cell_range(comp.x, comp.y, comp.x + comp.width, comp.y + comp.height):
+            self.buckets.setdefault(cell, []).append(comp)
+
+    def remove(self, comp: Component):
+        for cell in self._cell_range(comp.x, comp.y, comp.x + comp.width, comp.y + comp.height):
+            bucket = self.buckets.get(cell)
+            if bucket is None:
+                continue
+            # Remove by identity so equal-but-distinct components stay put
+            for i, other in enumerate(bucket):
+                if other is comp:
+                    del bucket[i]
+                    break
+            if not bucket:
+                del self.buckets[cell]
+
+    def is_blocked(self, point: Point) -> bool:
+        return self.is_blocked_xy(point.x, point.y)
+
+    def is_blocked_xy(self, x: int, y: int) -> bool:
+        self.checks += 1
+        size = self.cell_size
+        bucket = self.buckets.get((x // size, y // size))
+        if not bucket:
+            return False
+        for comp in bucket:
+            if (comp.x <= x <= comp.x + comp.width and
+                    comp.y <= y <= comp.y + comp.height):
+                return True
+        return False
+
+    def segment_blocked(self, p1: Point, p2: Point) -> bool:
+        return self.segment_blocked_xy(p1.x, p1.y, p2.x, p2.y)
+
+    def segment_blocked_xy(self, x1: int, y1: int, x2: int, y2: int) -> bool:
+        # Closed segment test: touching a perimeter counts as a hit, as in
+        # Component.intersects_segment, which shares the box test
+        self.checks += 1
+        x_min, x_max = min(x1, x2), max(x1, x2)
+        y_min, y_max = min(y1, y2), max(y1, y2)
+        for cell in self._cell_range(x_min, y_min, x_max, y_max):
+            bucket = self.buckets.get(cell)
+            if bucket and any_overlaps_box(bucket, x_min, y_min, x_max, y_max):
+                return True
+        return False
@@ -0,0 +1,46 @@
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional
+import time
+
+# Called as timer(phase, seconds) each time a phase finishes
+PhaseTimer = Callable[[str, float], None]
+
+@dataclass
+class RouteStats:
+    """Counters for one routing call, returned when asked for with return_stats=True.
+
+    nodes_expanded counts nodes taken off the open set and searched from;
+    heap_pops also counts stale heap entries that were skipped. Phases are
+    'setup', 'search' and 'reconstruction', plus 'global' for the tile
+    search of hierarchical routes.
+    """
+    nodes_expanded: int = 0
+    nodes_generated: int = 0
+    heap_pushes: int = 0
+    heap_pops: int = 0
+    peak_open: int = 0
+    obstacle_checks: int = 0
+    cache_hits: int = 0
+    phase_times: Dict[str, float] = field(default_factory=dict)
+    timer: Optional[PhaseTimer] = field(default=None, repr=False, compare=False)
+
+    @contextmanager
+    def phase(self, name: str):
+        began = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - began
+            self.phase_times[name] = self.phase_times.get(name, 0.0) + elapsed
+            if self.timer is not None:
+                self.timer(name, elapsed)
+
+FIELDS = ('nodes_expanded', 'nodes_generated', 'heap_pushes', 'heap_pops',
+          'peak_open', 'obstacle_checks', 'cache_hits')
+
+def stats_to_dict(stats) -> dict:
+    # Duck-typed so the o1 and gais RouteStats copies convert the same way
+    result = {name: getattr(stats, name) for name in FIELDS}
+    result['phase_times'] = dict(stats.phase_times)
+    return result
@@ -0,0 +1,102 @@
+"""Rectilinear Steiner trees for multi-pin nets.
+
+The tree grows one pin at a time, as in Prim's algorithm. Every grid point
+of the wire routed so far is a source of one multi-source search, which
+stops at the first remaining pin it reaches. The new branch is attached
+wherever on the tree is cheapest, so branches share trunks. This usually
+gives much less wire than routing each load from the driver separately:
+
+    net = route_steiner(components, [driver, *loads])
+    print(net.wirelength, len(net.unconnected))
+"""
+import logging
+from dataclasses import dataclass, field
+from typing import Collection, Dict, List, Optional, Sequence
+from models import Component, Pin, Point
+from board import pack_point
+from router import manhattan_distance, search_from, trace_back
+from spatial_index import ObstacleIndex
+from stats import PhaseTimer, RouteStats
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class SteinerNet:
+    # Branches in the order they were added. The first runs from the first
+    # pin; every later one starts on the tree and ends at a newly joined pin.
+    branches: List[List[Point]] = field(default_factory=list)
+    connected: List[Pin] = field(default_factory=list)
+    unconnected: List[Pin] = field(default_factory=list)
+
+    @property
+    def wirelength(self) -> int:
+        return sum(abs(a.x - b.x) + abs(a.y - b.y)
+                   for branch in self.branches for a, b in zip(branch, branch[1:]))
+
+def _wire_keys(wire: List[Point]) -> List[int]:
+    # Every grid point along a run of orthogonal segments
+    keys = [pack_point(wire[0].x, wire[0].y)]
+    for a, b in zip(wire, wire[1:]):
+        dx = (b.x > a.x) - (b.x < a.x)
+        dy = (b.y > a.y) - (b.y < a.y)
+        for i in range(1, abs(b.x - a.x) + abs(b.y - a.y) + 1):
+            keys.append(pack_point(a.x + dx * i, a.y + dy * i))
+    return keys
+
+def route_steiner(components: Collection[Component], pins: Sequence[Pin],
+                  return_stats: bool = False, timer: Optional[PhaseTimer] = None,
+                  obstacles: Optional[ObstacleIndex] = None):
+    # Returns a SteinerNet, or (SteinerNet, RouteStats) when return_stats is
+    # set. pins[0] starts the tree; pins that cannot be reached end up in
+    # unconnected.
+    stats = RouteStats(timer=timer)
+    net = SteinerNet()
+    if not pins:
+        return (net, stats) if return_stats else net
+
+    with stats.phase('setup'):
+        if obstacles is None:
+            obstacles = ObstacleIndex(components)
+        root = pins[0].get_absolute_position()
+        exits: Dict[int, List[Pin]] = {}
+        max_distance = 0
+        for pin in pins[1:]:
+            pos = pin.get_absolute_position()
+            dx, dy = pin.exit_direction()
+            if obstacles.is_blocked_xy(pos.x + dx, pos.y + dy):
+                net.unconnected.append(pin)
+                continue
+            exits.setdefault(pack_point(pos.x + dx, pos.y + dy), []).append(pin)
+            max_distance = max(max_distance, manhattan_distance(root, pos) * 5)
+        dx, dy = pins[0].exit_direction()
+        if obstacles.is_blocked_xy(root.x + dx, root.y + dy):
+            net.unconnected.extend(pin for group in exits.values() for pin in group)
+            net.unconnected.insert(0, pins[0])
+            return (net, stats) if return_stats else net
+        net.connected.append(pins[0])
+        # Cost 1 for the step out of the root pin, as in find_route
+        tree = {pack_point(root.x + dx, root.y + dy): 1}
+
+    with stats.phase('search'):
+        while exits:
+            settled, _, came_from = search_from(obstacles, tree, set(exits), root, max_distance,
+                                                stop_at_first=True, stats=stats)
+            if not settled:
+                break
+            key = settled[0]
+            # The wire from the tree to the pin's exit point joins the tree;
+            # the pin itself sits on a component edge and carries no wire
+            wire = trace_back(came_from, key)
+            tree.update((point, 0) for point in _wire_keys(wire))
+            if not net.branches:
+                wire.insert(0, root)
+            for pin in exits.pop(key):
+                # Pins sharing an exit point all hang off the same branch end
+                net.branches.append(wire + [pin.get_absolute_position()])
+                net.connected.append(pin)
+                wire = [wire[-1]]
+
+    net.unconnected.extend(pin for group in exits.values() for pin in group)
+    logger.debug("Steiner net joined %d of %d pins with %d units of wire",
+                 len(net.connected), len(pins), net.wirelength)
+    return (net, stats) if return_stats else net
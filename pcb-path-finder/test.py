@@ -1,65 +1,16 @@
+import logging
 import random
 import matplotlib.pyplot as plt
 from models import Component, Pin, Point
-from router import find_route
+from router import find_route_anytime
+from generator import generate_board
+from visualizer import PathVisualizer
 from typing import Set, Tuple, List
 
 def generate_test_case() -> Tuple[Set[Component], Pin, Pin]:
-    components = set()
-    all_pins = []
-    
-    # Generate random components
     num_components = random.randint(10, 50)  # Reduced from 20-100
-    grid_size = int(num_components * 1.0)
-    
-    def generate_component_location() -> Tuple[int, int]:
-        while True:
-            x = random.randint(0, grid_size * 5)
-            y = random.randint(0, grid_size * 5)
-            width = random.randint(3, 10)   # Reduced from 5-15
-            height = random.randint(3, 10)  # Reduced from 5-15
-            
-            # Check if location is valid (no overlap with existing components)
-            valid = True
-            for comp in components:
-                if (abs(x - comp.x) < width + comp.width + 2 and 
-                    abs(y - comp.y) < height + comp.height + 2):
-                    valid = False
-                    break
-            
-            if valid:
-                return x, y, width, height
-    
-    # Create components with random pins
-    for _ in range(num_components):
-        x, y, width, height = generate_component_location()
-        
-        # Create the component first with an empty set of pins
-        component = Component(x, y, width, height, set())
-        components.add(component)
-        
-        # Generate random pins on perimeter
-        num_pins = random.randint(8, 30)
-        for _ in range(num_pins):
-            # Randomly choose which side to place the pin
-            side = random.randint(0, 3)
-            if side == 0:  # Bottom
-                pin_x = random.randint(1, width-1)
-                pin_y = 0
-            elif side == 1:  # Right
-                pin_x = width
-                pin_y = random.randint(1, height-1)
-            elif side == 2:  # Top
-                pin_x = random.randint(1, width-1)
-                pin_y = height
-            else:  # Left
-                pin_x = 0
-                pin_y = random.randint(1, height-1)
-            
-            # Create pin with reference to component immediately
-            new_pin = Pin(pin_x, pin_y, component)
-            component.pins.add(new_pin)
-            all_pins.append(new_pin)
+    components = generate_board(num_components, seed=random.randrange(2 ** 32))
+    all_pins = [pin for comp in components for pin in comp.pins]
     
     # Select two random pins
     start_pin, end_pin = random.sample(all_pins, 2)
@@ -98,15 +49,23 @@ def visualize_result(components: Set[Component], start_pin: Pin, end_pin: Pin, p
     plt.show()
 
 def main():
+    # Show the router's progress messages, not every library's debug output
+    logging.basicConfig(format='%(message)s')
+    logging.getLogger('router').setLevel(logging.DEBUG)
+    
     # Generate and solve test case
     components, start_pin, end_pin = generate_test_case()
-    path = find_route(components, start_pin, end_pin)
+    vis = PathVisualizer(components, start_pin, end_pin)
+    # Best route found within the deadline, improved while time allows
+    path = find_route_anytime(components, start_pin, end_pin, deadline=10.0,
+                              observer=vis.observe)
     
     if path:
         print(f"Path found with {len(path)} points")
         visualize_result(components, start_pin, end_pin, path)
     else:
         print("No path found")
+        vis.show_final_path(path, block=False)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
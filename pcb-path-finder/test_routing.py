@@ -0,0 +1,60 @@
+import random
+from board import pack_point
+from generator import generate_board
+from multi_net import _Congestion, path_cells
+from router import find_route, find_routes_from
+from spatial_index import ObstacleIndex
+
+def path_length(path) -> int:
+    return sum(abs(a.x - b.x) + abs(a.y - b.y) for a, b in zip(path, path[1:]))
+
+def fan_out(seed: int, loads: int = 8):
+    components = generate_board(100, seed=seed)
+    pins = sorted((pin for comp in components for pin in comp.pins),
+                  key=lambda p: (p.get_absolute_position().x, p.get_absolute_position().y))
+    driver, *sinks = random.Random(seed).sample(pins, loads + 1)
+    return components, driver, sinks
+
+def test_fan_out_does_no_more_work_than_separate_routes():
+    for seed in range(5):
+        components, driver, sinks = fan_out(seed)
+        obstacles = ObstacleIndex(components)
+        paths, stats = find_routes_from(components, driver, sinks, return_stats=True,
+                                        obstacles=obstacles)
+        expanded = 0
+        for sink, path in zip(sinks, paths):
+            single, single_stats = find_route(components, driver, sink, return_stats=True,
+                                              obstacles=obstacles)
+            expanded += single_stats.nodes_expanded
+            if single:
+                assert path and path_length(path) <= path_length(single)
+        assert stats.nodes_expanded <= expanded
+
+def test_bidirectional_search_charges_congestion_like_forward_search():
+    # Random congestion on about a third of the cells around the board; both
+    # searches are exact, so their routes must cost the same
+    for seed in range(6):
+        components = generate_board(30, seed=seed)
+        rng = random.Random(seed)
+        pins = sorted((pin for comp in components for pin in comp.pins),
+                      key=lambda p: (p.get_absolute_position().x, p.get_absolute_position().y))
+        start_pin, end_pin = rng.sample(pins, 2)
+        congestion = _Congestion()
+        x_min = min(comp.x for comp in components) - 5
+        y_min = min(comp.y for comp in components) - 5
+        x_max = max(comp.x + comp.width for comp in components) + 5
+        y_max = max(comp.y + comp.height for comp in components) + 5
+        for x in range(x_min, x_max + 1):
+            for y in range(y_min, y_max + 1):
+                if rng.random() < 0.3:
+                    congestion.cost[pack_point(x, y)] = rng.choice((0.5, 2.0, 4.0))
+
+        def total_cost(path) -> float:
+            return path_length(path) + sum(congestion.cost.get(key, 0.0) for key in path_cells(path))
+
+        forward = find_route(components, start_pin, end_pin, segment_cost=congestion.segment_cost)
+        both = find_route(components, start_pin, end_pin, segment_cost=congestion.segment_cost,
+                          bidirectional=True)
+        assert bool(forward) == bool(both)
+        if forward:
+            assert total_cost(forward) == total_cost(both)
@@ -0,0 +1,198 @@
+from bisect import bisect_left
+from typing import Dict, Optional, Set, Tuple
+import heapq
+from models import Component, Pin, Point
+from board import pack_point
+from router import simplify_path
+from spatial_index import ObstacleIndex
+from stats import PhaseTimer, RouteStats
+
+DIRECTIONS = [(0, 1), (1, 0), (0, -1), (-1, 0)]
+
+def build_hanan_lines(components: Set[Component], start_pin: Optional[Pin] = None,
+                      end_pin: Optional[Pin] = None):
+    # Channel lines one unit outside every component edge, plus the lines
+    # through both pins so their escape points sit on the grid
+    xs = set()
+    ys = set()
+    for comp in components:
+        xs.add(comp.x - 1)
+        xs.add(comp.x + comp.width + 1)
+        ys.add(comp.y - 1)
+        ys.add(comp.y + comp.height + 1)
+    for pin in (start_pin, end_pin):
+        if pin is None:
+            continue
+        pos = pin.get_absolute_position()
+        dx, dy = pin.exit_direction()
+        xs.add(pos.x + dx)
+        ys.add(pos.y + dy)
+    return sorted(xs), sorted(ys)
+
+def _with_line(lines: list, value: int) -> list:
+    i = bisect_left(lines, value)
+    if i < len(lines) and lines[i] == value:
+        return lines
+    return lines[:i] + [value] + lines[i:]
+
+class VisibilityGraph:
+    """Hanan lines of one board plus the point and edge tests made on them.
+
+    Build one per board and pass it to every find_route_visibility call:
+    the component lines are computed once, each query only inserts its two
+    pin lines, and whether a grid point is free or an edge is clear is
+    remembered across queries. The caches are dropped once they hold
+    max_cached entries.
+    """
+
+    def __init__(self, components: Set[Component], obstacles: Optional[ObstacleIndex] = None,
+                 max_cached: int = 2000000):
+        self.obstacles = obstacles if obstacles is not None else ObstacleIndex(components)
+        self.xs, self.ys = build_hanan_lines(components)
+        self.max_cached = max_cached
+        self.free: Dict[int, bool] = {}
+        self.clear: Dict[Tuple[int, int], bool] = {}
+
+    def lines(self, start_pin: Pin, end_pin: Pin):
+        xs, ys = self.xs, self.ys
+        for pin in (start_pin, end_pin):
+            pos = pin.get_absolute_position()
+            dx, dy = pin.exit_direction()
+            xs = _with_line(xs, pos.x + dx)
+            ys = _with_line(ys, pos.y + dy)
+        return xs, ys
+
+    def trim(self):
+        if len(self.free) + len(self.clear) > self.max_cached:
+            self.free.clear()
+            self.clear.clear()
+
+def find_route_visibility(components: Set[Component], start_pin: Pin, end_pin: Pin,
+                          bend_penalty: int = 1, return_stats: bool = False,
+                          timer: Optional[PhaseTimer] = None,
+                          obstacles: Optional[ObstacleIndex] = None,
+                          graph: Optional[VisibilityGraph] = None):
+    # Returns the path, or (path, RouteStats) when return_stats is set.
+    # graph may be a VisibilityGraph of components kept across queries;
+    # otherwise one is built here, on obstacles when given.
+    stats = RouteStats(timer=timer)
+    with stats.phase('setup'):
+        if graph is None:
+            graph = VisibilityGraph(components, obstacles)
+        graph.trim()
+        obstacles = graph.obstacles
+        checks_before = obstacles.checks
+        xs, ys = graph.lines(start_pin, end_pin)
+        x_index = {x: i for i, x in enumerate(xs)}
+        y_index = {y: j for j, y in enumerate(ys)}
+
+        start_pos = start_pin.get_absolute_position()
+        end_pos = end_pin.get_absolute_position()
+        sdx, sdy = start_pin.exit_direction()
+        edx, edy = end_pin.exit_direction()
+        start_exit = Point(start_pos.x + sdx, start_pos.y + sdy)
+        end_exit = Point(end_pos.x + edx, end_pos.y + edy)
+        # The last segment runs from end_exit back into the pin
+        final_dir = DIRECTIONS.index((-edx, -edy))
+        # A pin whose exit point lies in another component cannot be reached
+        exit_blocked = obstacles.is_blocked_xy(start_exit.x, start_exit.y) or \
+            obstacles.is_blocked_xy(end_exit.x, end_exit.y)
+    if exit_blocked:
+        stats.obstacle_checks = obstacles.checks - checks_before
+        return ([], stats) if return_stats else []
+
+    nx, ny = len(xs), len(ys)
+    free_cache = graph.free
+    clear_cache = graph.clear
+
+    def heuristic(i: int, j: int) -> int:
+        return abs(xs[i] - end_exit.x) + abs(ys[j] - end_exit.y)
+
+    # States are (grid node, incoming direction) packed into one integer
+    si, sj = x_index[start_exit.x], y_index[start_exit.y]
+    gi, gj = x_index[end_exit.x], y_index[end_exit.y]
+    start_state = (si * ny + sj) * 4 + DIRECTIONS.index((sdx, sdy))
+    g_score = {start_state: 0}
+    came_from: Dict[int, int] = {}
+    open_set = [(heuristic(si, sj), 0, start_state)]
+    best_cost = None
+    best_state = None
+    pops = expanded = generated = pushes = cache_hits = 0
+    peak_open = 1
+
+    with stats.phase('search'):
+        while open_set:
+            f, g, state = heapq.heappop(open_set)
+            pops += 1
+            if g > g_score.get(state, g):
+                continue
+            if best_cost is not None and f >= best_cost:
+                break
+            expanded += 1
+            node, d = divmod(state, 4)
+            i, j = divmod(node, ny)
+            if i == gi and j == gj:
+                total = g + (bend_penalty if d != final_dir else 0)
+                if best_cost is None or total < best_cost:
+                    best_cost = total
+                    best_state = state
+                continue
+            for nd, (dx, dy) in enumerate(DIRECTIONS):
+                if nd == (d + 2) % 4:
+                    continue
+                ni, nj = i + dx, j + dy
+                if not (0 <= ni < nx and 0 <= nj < ny):
+                    continue
+                x1, y1, x2, y2 = xs[i], ys[j], xs[ni], ys[nj]
+                target = pack_point(x2, y2)
+                free = free_cache.get(target)
+                if free is None:
+                    free = free_cache[target] = not obstacles.is_blocked_xy(x2, y2)
+                else:
+                    cache_hits += 1
+                if not free:
+                    continue
+                edge = (pack_point(x1, y1), target)
+                clear = clear_cache.get(edge)
+                if clear is None:
+                    # Skip (x1, y1) itself so the segment may leave from the escape point
+                    clear = clear_cache[edge] = not obstacles.segment_blocked_xy(x1 + dx, y1 + dy, x2, y2)
+                else:
+                    cache_hits += 1
+                if not clear:
+                    continue
+                generated += 1
+                cost = g + abs(x2 - x1) + abs(y2 - y1)
+                if nd != d:
+                    cost += bend_penalty
+                next_state = (ni * ny + nj) * 4 + nd
+                if cost < g_score.get(next_state, cost + 1):
+                    g_score[next_state] = cost
+                    came_from[next_state] = state
+                    pushes += 1
+                    heapq.heappush(open_set, (cost + heuristic(ni, nj), cost, next_state))
+            if len(open_set) > peak_open:
+                peak_open = len(open_set)
+
+    stats.nodes_expanded = expanded
+    stats.nodes_generated = generated
+    stats.heap_pushes = pushes + 1
+    stats.heap_pops = pops
+    stats.peak_open = peak_open
+    stats.obstacle_checks = obstacles.checks - checks_before
+    stats.cache_hits = cache_hits
+
+    path = []
+    with stats.phase('reconstruction'):
+        if best_state is not None:
+            corners = []
+            state = best_state
+            while True:
+                i, j = divmod(state // 4, ny)
+                corners.append(Point(xs[i], ys[j]))
+                if state not in came_from:
+                    break
+                state = came_from[state]
+            corners.reverse()
+            path = simplify_path([start_pos] + corners + [end_pos])
+    return (path, stats) if return_stats else path
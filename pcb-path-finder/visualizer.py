@@ -1,6 +1,8 @@
 import matplotlib.pyplot as plt
+from matplotlib.collections import PatchCollection
 from matplotlib.patches import Rectangle, Circle
 from models import Component, Pin, Point
+from board import pack_point, unpack_point
 from typing import Set, List, Dict, Optional
 import numpy as np
 
@@ -11,129 +13,195 @@ class PathVisualizer:
         self.end_pin = end_pin
         self.fig, (self.ax1, self.ax2) = plt.subplots(1, 2, figsize=(20, 10))
         self.explored_points: Set[Point] = set()
+        self.explored_keys: Set[int] = set()
+        # Explored points fill a growing array, doubled when full, so each
+        # frame appends only its new points
+        self.explored_xy = np.empty((1024, 2))
+        self.explored_used = 0
+        # Frontier points in slots of a growing array; a node that leaves the
+        # open set becomes NaN, which matplotlib skips, so a frame only
+        # touches the nodes that changed since the last one
+        self.frontier_slots: Dict[int, int] = {}
+        self.frontier_xy = np.full((1024, 2), np.nan)
+        self.frontier_used = 0
         self.current_path: List[Point] = []
-        
+
         # Calculate bounds
         self.min_x = min(comp.x for comp in components)
         self.min_y = min(comp.y for comp in components)
         self.max_x = max(comp.x + comp.width for comp in components)
         self.max_y = max(comp.y + comp.height for comp in components)
-        
+
         # Add padding
         padding = max(self.max_x - self.min_x, self.max_y - self.min_y) * 0.1
         self.min_x = int(self.min_x - padding)
         self.min_y = int(self.min_y - padding)
         self.max_x = int(self.max_x + padding)
         self.max_y = int(self.max_y + padding)
-        
+
         self.setup_plot()
-        
+
     def setup_plot(self):
-        # Setup main plot
+        # Static artists are built once; update() only touches the dynamic ones
         self.ax1.set_title("Path Finding Progress")
         self.ax1.set_xlim(self.min_x, self.max_x)
         self.ax1.set_ylim(self.min_y, self.max_y)
         self.ax1.grid(True)
-        
-        # Setup heatmap plot
+
         self.ax2.set_title("Exploration Density")
         self.ax2.set_xlim(self.min_x, self.max_x)
         self.ax2.set_ylim(self.min_y, self.max_y)
-        
+
         # Draw components
-        for comp in self.components:
-            # Draw component
-            rect = Rectangle((comp.x, comp.y), comp.width, comp.height,
-                           fill=False, color='blue', linewidth=2)
-            self.ax1.add_patch(rect)
-            self.ax2.add_patch(Rectangle((comp.x, comp.y), comp.width, comp.height,
-                                       fill=True, color='gray'))
-            
-            # Draw pins
-            for pin in comp.pins:
-                pos = pin.get_absolute_position()
-                self.ax1.plot(pos.x, pos.y, 'r.', markersize=3)
-        
+        outlines = [Rectangle((comp.x, comp.y), comp.width, comp.height)
+                    for comp in self.components]
+        self.ax1.add_collection(PatchCollection(
+            outlines, facecolor='none', edgecolor='blue', linewidth=2))
+        shadows = [Rectangle((comp.x, comp.y), comp.width, comp.height)
+                   for comp in self.components]
+        self.ax2.add_collection(PatchCollection(
+            shadows, facecolor='gray', edgecolor='none', alpha=0.5, zorder=2))
+
+        # Draw pins
+        pin_positions = [pin.get_absolute_position()
+                         for comp in self.components for pin in comp.pins]
+        self.ax1.scatter([p.x for p in pin_positions], [p.y for p in pin_positions],
+                         c='r', s=3)
+
         # Highlight start and end pins
         start_pos = self.start_pin.get_absolute_position()
         end_pos = self.end_pin.get_absolute_position()
         self.ax1.plot(start_pos.x, start_pos.y, 'go', markersize=10, label='Start')
         self.ax1.plot(end_pos.x, end_pos.y, 'ro', markersize=10, label='End')
+
+        # Dynamic artists, filled in by update()
+        self.explored_line, = self.ax1.plot([], [], 'c.', markersize=1, alpha=0.3,
+                                            label='Explored')
+        self.frontier_line, = self.ax1.plot([], [], 'm.', markersize=3, label='Frontier')
+        self.current_marker, = self.ax1.plot([], [], 'y*', markersize=15, label='Current')
+        self.path_line, = self.ax1.plot([], [], 'g-', linewidth=3, label='Final Path')
         self.ax1.legend()
-        
+
         # Initialize heatmap data
         self.grid_size = 100
         self.heatmap_data = np.zeros((self.grid_size, self.grid_size))
-        
-    def update(self, current_point: Point, explored_points: Set[Point], 
-               g_scores: Dict[Point, float], open_set: List[tuple], 
+        self.heatmap = self.ax2.imshow(self.heatmap_data,
+                                       extent=[self.min_x, self.max_x,
+                                               self.min_y, self.max_y],
+                                       origin='lower', cmap='hot', aspect='auto',
+                                       vmin=0, vmax=1, zorder=1)
+        self.info_text = self.ax2.text(0.02, 0.98, "", transform=self.ax2.transAxes,
+                                       verticalalignment='top', fontfamily='monospace',
+                                       bbox=dict(facecolor='white', alpha=0.8), zorder=3)
+
+    def update(self, current_point: Point, explored_points: Set[Point],
+               g_scores: Dict[Point, float], open_set: Optional[List[tuple]],
                iteration: int, show: bool = False):
-        self.explored_points.update(explored_points)
-        
-        # Update main plot
-        self.ax1.cla()
-        self.setup_plot()
-        
-        # Draw explored points
-        x_coords = [p.x for p in self.explored_points]
-        y_coords = [p.y for p in self.explored_points]
-        self.ax1.plot(x_coords, y_coords, 'c.', markersize=1, alpha=0.3, label='Explored')
-        
-        # Draw current point
-        if current_point:
-            self.ax1.plot(current_point.x, current_point.y, 'y*', markersize=15, 
-                         label='Current')
-        
-        # Draw open set
-        if open_set:
-            open_points = [point for _, _, point in open_set]
-            x_coords = [p.x for p in open_points]
-            y_coords = [p.y for p in open_points]
-            self.ax1.plot(x_coords, y_coords, 'm.', markersize=3, label='Frontier')
-        
-        self.ax1.legend()
-        
-        # Update heatmap
-        if explored_points:
-            x_coords = np.array([p.x for p in explored_points])
-            y_coords = np.array([p.y for p in explored_points])
-            
+        # open_set None keeps the frontier drawn by observe()
+        # Only points not seen in earlier frames are drawn and binned
+        new_points = explored_points - self.explored_points
+        self.explored_points.update(new_points)
+
+        if new_points:
+            x_coords = np.fromiter((p.x for p in new_points), dtype=np.int64,
+                                   count=len(new_points))
+            y_coords = np.fromiter((p.y for p in new_points), dtype=np.int64,
+                                   count=len(new_points))
+            end = self.explored_used + len(new_points)
+            if end > len(self.explored_xy):
+                grown = np.empty((max(end, 2 * len(self.explored_xy)), 2))
+                grown[:self.explored_used] = self.explored_xy[:self.explored_used]
+                self.explored_xy = grown
+            self.explored_xy[self.explored_used:end, 0] = x_coords
+            self.explored_xy[self.explored_used:end, 1] = y_coords
+            self.explored_used = end
+            used = self.explored_xy[:end]
+            self.explored_line.set_data(used[:, 0], used[:, 1])
+
             # Normalize coordinates to grid size
             x_norm = ((x_coords - self.min_x) / (self.max_x - self.min_x) * (self.grid_size - 1)).astype(int)
             y_norm = ((y_coords - self.min_y) / (self.max_y - self.min_y) * (self.grid_size - 1)).astype(int)
-            
+
             # Clip to valid indices
             x_norm = np.clip(x_norm, 0, self.grid_size - 1)
             y_norm = np.clip(y_norm, 0, self.grid_size - 1)
-            
-            # Update heatmap
-            for x, y in zip(x_norm, y_norm):
-                self.heatmap_data[y, x] += 1
-        
-        self.ax2.cla()
-        self.ax2.set_title("Exploration Density")
-        self.ax2.imshow(self.heatmap_data, extent=[self.min_x, self.max_x, 
-                                                  self.min_y, self.max_y],
-                       origin='lower', cmap='hot', aspect='auto')
-        
+
+            np.add.at(self.heatmap_data, (y_norm, x_norm), 1)
+            self.heatmap.set_data(self.heatmap_data)
+            self.heatmap.set_clim(0, max(1.0, self.heatmap_data.max()))
+
+        # Draw current point
+        if current_point:
+            self.current_marker.set_data([current_point.x], [current_point.y])
+        else:
+            self.current_marker.set_data([], [])
+
+        # Draw open set
+        if open_set is not None:
+            self.frontier_line.set_data([entry[-1].x for entry in open_set],
+                                        [entry[-1].y for entry in open_set])
+        open_size = len(open_set) if open_set is not None else len(self.frontier_slots)
+
         # Add text information
         info_text = f"Iteration: {iteration}\n"
-        info_text += f"Explored Points: {len(explored_points)}\n"
-        info_text += f"Open Set Size: {len(open_set)}\n"
+        info_text += f"Explored Points: {len(self.explored_points)}\n"
+        info_text += f"Open Set Size: {open_size}\n"
         info_text += f"Current g-score: {g_scores.get(current_point, 0):.1f}"
-        
-        self.ax2.text(0.02, 0.98, info_text, transform=self.ax2.transAxes,
-                     verticalalignment='top', fontfamily='monospace',
-                     bbox=dict(facecolor='white', alpha=0.8))
-        
+        self.info_text.set_text(info_text)
+
         if show:
             plt.pause(0.001)
-    
-    def show_final_path(self, path: List[Point]):
+
+    def observe(self, current_point: Point, g_scores: Dict[int, float],
+                opened: List[int], expanded: List[int], iteration: int):
+        # SearchObserver hook for router.find_route. It passes only the nodes
+        # pushed and expanded since the last frame, so a frame costs in
+        # proportion to them rather than to the whole search.
+        new_keys = {key for key in opened if key not in self.explored_keys}
+        self.explored_keys.update(new_keys)
+        explored = {Point(*unpack_point(key)) for key in new_keys}
+        self._update_frontier(opened, expanded)
+        current_g = {current_point: g_scores.get(pack_point(current_point.x, current_point.y), 0)}
+        self.update(current_point, explored, current_g, None, iteration, show=True)
+
+    def _update_frontier(self, opened: List[int], expanded: List[int]):
+        slots = self.frontier_slots
+        for key in opened:
+            if key in slots:
+                continue
+            if self.frontier_used == len(self.frontier_xy):
+                self._compact_frontier()
+            slots[key] = self.frontier_used
+            self.frontier_xy[self.frontier_used] = unpack_point(key)
+            self.frontier_used += 1
+        for key in expanded:
+            slot = slots.pop(key, None)
+            if slot is not None:
+                self.frontier_xy[slot] = np.nan
+        used = self.frontier_xy[:self.frontier_used]
+        self.frontier_line.set_data(used[:, 0], used[:, 1])
+
+    def _compact_frontier(self):
+        # Out of slots: drop the NaN holes, and double the array when the live
+        # points would still fill more than half of it
+        live = list(self.frontier_slots)
+        size = len(self.frontier_xy)
+        if 2 * len(live) > size:
+            size *= 2
+        xy = np.full((size, 2), np.nan)
+        for slot, key in enumerate(live):
+            xy[slot] = self.frontier_xy[self.frontier_slots[key]]
+            self.frontier_slots[key] = slot
+        self.frontier_xy = xy
+        self.frontier_used = len(live)
+
+    def show_final_path(self, path: List[Point], block: bool = True):
+        # block=False draws the path and returns, for interactive callers
+        # that keep running after a failed or partial route
         if path:
-            path_x = [p.x for p in path]
-            path_y = [p.y for p in path]
-            self.ax1.plot(path_x, path_y, 'g-', linewidth=3, label='Final Path')
-            self.ax1.legend()
-        
-        plt.show() 
\ No newline at end of file
+            self.path_line.set_data([p.x for p in path], [p.y for p in path])
+
+        if block:
+            plt.show()
+        else:
+            plt.pause(0.001)